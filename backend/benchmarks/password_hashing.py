@@ -0,0 +1,67 @@
+"""Logins per second per core for candidate password hashing policies.
+
+Usage (from backend/):
+
+    python benchmarks/password_hashing.py [--methods scrypt:32768:8:1,pbkdf2:sha256:600000] [--seconds 3]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import check_password_hash, generate_password_hash
+from src.services.passwords import PasswordHasher
+
+DEFAULT_METHODS = 'scrypt:32768:8:1,scrypt:16384:8:1,pbkdf2:sha256:600000,pbkdf2:sha256:260000'
+
+def _timed(seconds, run_one):
+    """Call ``run_one`` until ``seconds`` elapse; returns (calls, elapsed)"""
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        run_one()
+        calls += 1
+    return calls, time.perf_counter() - start
+
+def bench_method(method, seconds, threads):
+    password = 'correct horse battery staple'
+    password_hash = generate_password_hash(password, method=method)
+
+    calls, elapsed = _timed(seconds, lambda: check_password_hash(password_hash, password))
+    single = calls / elapsed
+
+    hasher = PasswordHasher(method=method, threads=threads, queue=threads)
+    with ThreadPoolExecutor(max_workers=threads) as clients:
+        start = time.perf_counter()
+        results = list(clients.map(
+            lambda _: _timed(seconds, lambda: hasher.verify(password_hash, password))[0], range(threads)
+        ))
+        pooled = sum(results) / (time.perf_counter() - start)
+
+    return {
+        'method': method,
+        'ms_per_login': 1000.0 / single,
+        'logins_per_sec_per_core': single,
+        'pooled_logins_per_sec': pooled,
+        'threads': threads
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--methods', default=DEFAULT_METHODS, help='Comma-separated Werkzeug hash methods')
+    parser.add_argument('--seconds', type=float, default=3.0, help='Measurement time per method and mode')
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1, help='Pool threads for the pooled run')
+    args = parser.parse_args()
+
+    print(f"{'method':<24} {'ms/login':>9} {'logins/s/core':>14} {'pooled logins/s':>16}")
+    for method in args.methods.split(','):
+        result = bench_method(method.strip(), args.seconds, args.threads)
+        print(f"{result['method']:<24} {result['ms_per_login']:>9.1f} "
+              f"{result['logins_per_sec_per_core']:>14.1f} "
+              f"{result['pooled_logins_per_sec']:>16.1f}  ({result['threads']} threads)")
+
+if __name__ == '__main__':
+    main()
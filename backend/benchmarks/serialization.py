@@ -0,0 +1,137 @@
+"""Catalog serialization: ORM objects with ``to_dict`` vs schema serializers over column tuples.
+
+Usage (from backend/):
+
+    python benchmarks/serialization.py [--courses 500] [--stages 5] [--videos 6] [--seconds 2]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_dir = tempfile.mkdtemp(prefix='serialization-bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ['DATABASE_READ_ROUTING'] = 'false'
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+from src.main import create_app
+from src.models.user import db
+from src.models.course import Course, CourseStage, StageVideo
+from src.services.catalog import listing_query, listing_rows_to_dicts, paginate_listing
+from src.services.course_tree import course_tree_dict, load_course_tree
+from src.services.serializers import OrjsonProvider, orjson
+
+def _timed(seconds, run_one):
+    """Call ``run_one`` until ``seconds`` elapse; returns milliseconds per call"""
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        run_one()
+        calls += 1
+    return (time.perf_counter() - start) * 1000.0 / calls
+
+def populate(courses, stages, videos):
+    course_ids = db.session.scalars(insert(Course).returning(Course.id, sort_by_parameter_order=True), [
+        {
+            'title': f'Course {i}', 'description': 'Description ' * 20, 'category': f'Category {i % 8}',
+            'difficulty': ('Beginner', 'Intermediate', 'Advanced')[i % 3], 'duration_weeks': 8,
+            'instructor': 'Instructor', 'average_rating': 4.5, 'enrolled_students': i,
+            'is_featured': i % 10 == 0, 'is_active': True
+        } for i in range(courses)
+    ]).all()
+    stage_ids = db.session.scalars(insert(CourseStage).returning(CourseStage.id, sort_by_parameter_order=True), [
+        {'course_id': course_id, 'title': f'Stage {j}', 'description': 'Stage description', 'duration_hours': 4,
+         'order_index': j, 'is_active': True}
+        for course_id in course_ids for j in range(stages)
+    ]).all()
+    db.session.execute(insert(StageVideo), [
+        {'stage_id': stage_id, 'title': f'Video {k}', 'youtube_id': 'dQw4w9WgXcQ', 'order_index': k,
+         'duration_minutes': 12, 'description': 'Video description', 'is_active': True}
+        for stage_id in stage_ids for k in range(videos)
+    ])
+    db.session.commit()
+    return course_ids
+
+def _fresh_session():
+    # Drop the identity map so every ORM run loads and builds objects again
+    db.session.remove()
+
+def bench_listing(seconds):
+    def orm_listing():
+        _fresh_session()
+        courses = Course.query.options(selectinload(Course.stages)).filter_by(is_active=True).order_by(Course.id).all()
+        return [course.to_dict() for course in courses]
+
+    def schema_listing():
+        _fresh_session()
+        rows, _ = paginate_listing(listing_query(), sort='newest')
+        return listing_rows_to_dicts(rows)
+
+    _fresh_session()
+    courses = Course.query.options(selectinload(Course.stages)).filter_by(is_active=True).all()
+    rows, _ = paginate_listing(listing_query(), sort='newest')
+    return [
+        ('listing', 'orm + to_dict', _timed(seconds, orm_listing), _timed(seconds, lambda: [c.to_dict() for c in courses])),
+        ('listing', 'columns + schema', _timed(seconds, schema_listing), _timed(seconds, lambda: listing_rows_to_dicts(rows)))
+    ]
+
+def bench_detail(seconds, course_ids):
+    sample = course_ids[:50]
+
+    def orm_detail():
+        _fresh_session()
+        return [load_course_tree(course_id).to_dict(include_stages=True) for course_id in sample]
+
+    def schema_detail():
+        _fresh_session()
+        return [course_tree_dict(course_id) for course_id in sample]
+
+    per_course = len(sample)
+    return [
+        ('detail', 'orm + to_dict', _timed(seconds, orm_detail) / per_course, None),
+        ('detail', 'columns + schema', _timed(seconds, schema_detail) / per_course, None)
+    ], [course_tree_dict(course_id) for course_id in sample]
+
+def bench_encoding(seconds, app, payloads):
+    providers = [('json', DefaultJSONProvider(app))]
+    if orjson is not None:
+        providers.append(('orjson', OrjsonProvider(app)))
+    return [
+        ('encode detail', name, _timed(seconds, lambda: [provider.dumps(p) for p in payloads]) / len(payloads), None)
+        for name, provider in providers
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--courses', type=int, default=500, help='Courses in the generated catalog')
+    parser.add_argument('--stages', type=int, default=5, help='Stages per course')
+    parser.add_argument('--videos', type=int, default=6, help='Videos per stage')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Measurement time per case')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        course_ids = populate(args.courses, args.stages, args.videos)
+
+        results = bench_listing(args.seconds)
+        detail_results, payloads = bench_detail(args.seconds, course_ids)
+        results += detail_results
+        results += bench_encoding(args.seconds, app, payloads)
+
+    print(f'{args.courses} courses x {args.stages} stages x {args.videos} videos'
+          f"{'' if orjson is not None else ' (orjson not installed)'}")
+    print(f"{'operation':<14} {'path':<18} {'ms/op':>10} {'ms dump only':>13}")
+    for operation, path, total_ms, dump_ms in results:
+        dump = f'{dump_ms:>13.3f}' if dump_ms is not None else f"{'-':>13}"
+        print(f'{operation:<14} {path:<18} {total_ms:>10.3f} {dump}')
+    shutil.rmtree(_db_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Flask CLI commands (run with ``flask --app src.main:app <command>``)"""
+import click
+from src.models.user import db
+from src.seed import seed_database
+from src.services.content_io import DEFAULT_BATCH_SIZE, export_courses, import_courses
+from src.services.progress_engine import reconcile_progress
+from src.services.query_plans import check_query_plans
+from src.services.rollups import rebuild_rollups, rollups_empty
+from src.services.schema import ensure_columns, ensure_indexes
+from src.services.search import install_search_index
+from src.services.user_search import install_user_search_index
+from src.static_files import precompress
+
+def init_database():
+    """Create or upgrade the schema and its derived structures; safe to repeat"""
+    db.create_all()
+    ensure_columns(db.engine)
+    ensure_indexes(db.engine)
+    
+    # FTS5 course search index, kept in sync by triggers
+    install_search_index(db.engine)
+    
+    # Trigram index for substring search in the admin user directory
+    install_user_search_index(db.engine)
+    
+    # Backfill analytics rollups for databases created before they existed
+    if rollups_empty():
+        rebuild_rollups()
+
+def register_commands(app):
+    @app.cli.command('init-db')
+    @click.option('--seed', 'with_seed', is_flag=True, help='Also seed demo courses and users')
+    def init_db_command(with_seed):
+        """Create tables, indexes and search indexes; backfill rollups"""
+        init_database()
+        click.echo('Database initialized')
+        if with_seed:
+            seed_command.callback()
+
+    @app.cli.command('seed')
+    def seed_command():
+        """Insert demo courses and users into empty tables"""
+        courses, users = seed_database()
+        click.echo(f'Seeded {courses} courses and {users} users')
+
+    @app.cli.command('import-courses')
+    @click.argument('source', type=click.File('r', encoding='utf-8'))
+    @click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Courses per transaction')
+    def import_courses_command(source, batch_size):
+        """Upsert courses from an NDJSON file ('-' for stdin)"""
+        try:
+            stats = import_courses(source, batch_size=batch_size)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(', '.join(f'{name}: {count}' for name, count in stats.items()))
+
+    @app.cli.command('export-courses')
+    @click.argument('target', type=click.File('w', encoding='utf-8'), default='-')
+    @click.option('--active-only', is_flag=True, help='Skip inactive courses')
+    def export_courses_command(target, active_only):
+        """Write every course with its stages and videos as NDJSON ('-' for stdout)"""
+        for line in export_courses(include_inactive=not active_only):
+            target.write(line)
+
+    @app.cli.command('compress-static')
+    def compress_static_command():
+        """Write .gz (and .br with brotli installed) next to compressible static files"""
+        written = precompress(app.static_folder)
+        click.echo(f'Wrote {written} compressed files')
+
+    @app.cli.command('check-query-plans')
+    @click.option('--verbose', is_flag=True, help='Print every plan, not only regressions')
+    def check_query_plans_command(verbose):
+        """EXPLAIN the hot queries; fail on a full scan, materialization or sort (SQLite)"""
+        if db.engine.dialect.name != 'sqlite':
+            raise click.ClickException('Query plan checks need a SQLite database')
+        regressions = 0
+        for name, plan, problems in check_query_plans():
+            if problems:
+                regressions += 1
+            if problems or verbose:
+                click.echo(f"{'SLOW' if problems else 'ok':<9} {name}" + (f" ({', '.join(problems)})" if problems else ''))
+                for detail in plan:
+                    click.echo(f'          {detail}')
+        if regressions:
+            raise click.ClickException(f'{regressions} hot queries scan, materialize or sort in full')
+        click.echo('All hot queries use indexes')
+
+    @app.cli.command('reconcile-progress')
+    @click.option('--dry-run', is_flag=True, help='Report drift without fixing it')
+    def reconcile_progress_command(dry_run):
+        """Recompute stage/course progress counters and report drift"""
+        report = reconcile_progress(apply=not dry_run)
+        click.echo(f"Stages checked: {report['stages_checked']}, drifted: {len(report['stage_drift'])}")
+        click.echo(f"Courses checked: {report['courses_checked']}, drifted: {len(report['course_drift'])}")
+        if report['stage_drift'] or report['course_drift']:
+            click.echo('Drift found and ' + ('left unchanged' if dry_run else 'repaired'))
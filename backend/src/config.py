@@ -0,0 +1,102 @@
+"""Database URI, engine pool options and SQLite pragmas from the environment (see .env.example)"""
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from src.db_routing import READ_BIND
+
+DEFAULT_DATABASE_URI = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value in (None, ''):
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+def sqlite_pragmas():
+    """Pragmas applied to every SQLite connection, in order"""
+    return {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000),
+        'mmap_size': _env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        'cache_size': _env_int('SQLITE_CACHE_SIZE', -65536),
+        'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY')
+    }
+
+def engine_options(uri):
+    """Pool options for ``SQLALCHEMY_ENGINE_OPTIONS``"""
+    sqlite = uri.startswith('sqlite')
+    options = {
+        # A local SQLite file cannot drop a connection, so the ping is only a
+        # wasted SELECT 1 per checkout there; network databases keep it
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', not sqlite),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800)
+    }
+    if uri == 'sqlite://' or sqlite and (':memory:' in uri or 'mode=memory' in uri):
+        # In-memory databases use a single-connection pool without size options
+        return options
+    # SQLite allows one writer at a time, so its file databases get a smaller pool
+    options['pool_size'] = _env_int('DB_POOL_SIZE', 5 if sqlite else 10)
+    options['max_overflow'] = _env_int('DB_MAX_OVERFLOW', 10 if sqlite else 20)
+    options['pool_timeout'] = _env_int('DB_POOL_TIMEOUT', 30)
+    return options
+
+def read_database_uri(uri):
+    """URI of the read engine, or None when reads stay on the primary"""
+    if not _env_bool('DATABASE_READ_ROUTING', True):
+        return None
+    read_uri = os.environ.get('DATABASE_READ_URL')
+    if read_uri:
+        return read_uri
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:') \
+            or url.query.get('uri'):
+        return None
+    # Same file, opened read-only through its own pool
+    return str(url.set(database=f'file:{url.database}', query={'mode': 'ro', 'uri': 'true'}))
+
+def configure_database(app):
+    """Populate the SQLAlchemy settings and SQLite pragmas in ``app.config``"""
+    uri = os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URI)
+    if uri.startswith('postgres://'):
+        # Heroku-style URLs use a scheme SQLAlchemy no longer accepts
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(uri)
+    read_uri = read_database_uri(uri)
+    app.config['SQLALCHEMY_BINDS'] = {
+        READ_BIND: dict(engine_options(read_uri), url=read_uri)
+    } if read_uri else {}
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLITE_PRAGMAS'] = sqlite_pragmas()
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Apply ``pragmas`` to each new connection of a SQLite engine"""
+    if engine.dialect.name != 'sqlite':
+        return False
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    return True
+
+def install_engine_pragmas(app, engines):
+    """Install the configured pragmas on the primary and read engines"""
+    pragmas = app.config['SQLITE_PRAGMAS']
+    for key, engine in engines.items():
+        if key == READ_BIND:
+            # A read-only connection cannot switch the journal mode; it
+            # follows whatever the primary set on the file
+            install_sqlite_pragmas(engine, {name: value for name, value in pragmas.items() if name != 'journal_mode'})
+        else:
+            install_sqlite_pragmas(engine, pragmas)
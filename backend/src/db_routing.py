@@ -0,0 +1,41 @@
+"""Routing of read-only requests to a separate read engine"""
+from functools import wraps
+from flask import g, has_app_context, request
+from flask_sqlalchemy.session import Session
+
+READ_BIND = 'read'
+
+_SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+def _reads_routed():
+    return has_app_context() and g.get('db_read_only', False)
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends SELECTs to the read bind when requested"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and clause is not None and getattr(clause, 'is_select', False) \
+                and not self._flushing and _reads_routed():
+            engine = self._db.engines.get(READ_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def read_only(view):
+    """Route the view's SELECTs to the read engine"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        previous = g.get('db_read_only', False)
+        g.db_read_only = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.db_read_only = previous
+    return wrapper
+
+def route_reads(blueprint):
+    """Route SELECTs of every GET/HEAD request in ``blueprint`` to the read engine"""
+    @blueprint.before_request
+    def _use_read_engine():
+        g.db_read_only = request.method in _SAFE_METHODS
+    return blueprint
@@ -9,348 +9,146 @@ from flask_jwt_extended import JWTManager
 from datetime import timedelta
 
 from src.models.user import db
-from src.models.course import Course, CourseStage, StageVideo
+from src.models.course import CatalogVersion, Course, CourseStage, StageVideo
 from src.models.progress import UserCourseProgress, UserStageProgress, UserVideoProgress
+from src.models.analytics import AnalyticsTotal, DailyCourseActivity, DailyRegistrations
 
 from src.routes.user import user_bp
 from src.routes.auth import auth_bp
 from src.routes.courses import courses_bp
 from src.routes.admin import admin_bp
+from src.routes.progress import progress_bp
+from src.cli import init_database, register_commands
+from src.config import configure_database, install_engine_pragmas
+from src.seed import seed_database
+from src.static_files import StaticManifest
+from src.services.passwords import password_hasher
+from src.services.progress_ingest import heartbeat_buffer
+from src.services.rate_limit import rate_limiter
+from src.services.serializers import configure_json
+from src.services.response_cache import admin_cache, dashboard_cache, facets_cache, principal_cache
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-
-# Configuration
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
-app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-change-in-production')
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=7)
-
-# Enable CORS for all routes
-CORS(app, origins=['http://localhost:5173', 'http://localhost:5174', 'http://localhost:3000'], supports_credentials=True)
-
-# Initialize JWT
-jwt = JWTManager(app)
-
-# Register blueprints
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(auth_bp, url_prefix='/api')
-app.register_blueprint(courses_bp, url_prefix='/api')
-app.register_blueprint(admin_bp, url_prefix='/api')
-
-# Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-
-# Create all database tables and seed data
-with app.app_context():
-    db.create_all()
-    print("Database tables created successfully!")
+def create_app():
+    """Build the Flask app; touches no database (see ``flask init-db`` and ``flask seed``)"""
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
     
-    # Seed courses if they don't exist
-    if Course.query.count() == 0:
-        print("Seeding courses...")
-        
-        courses_data = [
-            {
-                'title': 'Web Development Mastery',
-                'description': 'Learn modern web development with React, Node.js, and database integration',
-                'category': 'Development',
-                'difficulty': 'Beginner',
-                'duration_weeks': 12,
-                'thumbnail_url': '/src/assets/thumbnails/web_development.png',
-                'instructor': 'Mike Johnson',
-                'average_rating': 4.9,
-                'enrolled_students': 2847,
-                'is_featured': True,
-                'stages': [
-                    {
-                        'title': 'Introduction to Web Development',
-                        'description': 'Get started with the basics of web development',
-                        'duration_hours': 2,
-                        'order_index': 1,
-                        'videos': [
-                            {'title': 'What is Web Development?', 'duration_minutes': 15, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
-                            {'title': 'Setting Up Your Environment', 'duration_minutes': 22, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2},
-                            {'title': 'Your First HTML Page', 'duration_minutes': 18, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 3}
-                        ]
-                    },
-                    {
-                        'title': 'HTML Fundamentals',
-                        'description': 'Master HTML structure and semantic elements',
-                        'duration_hours': 3,
-                        'order_index': 2,
-                        'videos': [
-                            {'title': 'HTML Structure and Tags', 'duration_minutes': 25, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
-                            {'title': 'Forms and Input Elements', 'duration_minutes': 30, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2},
-                            {'title': 'Semantic HTML', 'duration_minutes': 20, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 3}
-                        ]
-                    }
-                ]
-            },
-            {
-                'title': 'Blog Development',
-                'description': 'Create engaging blogs with modern CMS and content strategies',
-                'category': 'Development',
-                'difficulty': 'Beginner',
-                'duration_weeks': 6,
-                'thumbnail_url': '/src/assets/thumbnails/blog_development.png',
-                'instructor': 'Sarah Wilson',
-                'average_rating': 4.7,
-                'enrolled_students': 1523,
-                'is_featured': False,
-                'stages': [
-                    {
-                        'title': 'Blog Basics',
-                        'description': 'Understanding blog fundamentals',
-                        'duration_hours': 2,
-                        'order_index': 1,
-                        'videos': [
-                            {'title': 'What Makes a Great Blog?', 'duration_minutes': 20, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
-                            {'title': 'Choosing Your Niche', 'duration_minutes': 25, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
-                        ]
-                    }
-                ]
-            },
-            {
-                'title': 'Trading & Finance',
-                'description': 'Master trading strategies, technical analysis, and risk management',
-                'category': 'Finance',
-                'difficulty': 'Intermediate',
-                'duration_weeks': 8,
-                'thumbnail_url': '/src/assets/thumbnails/trading.png',
-                'instructor': 'David Chen',
-                'average_rating': 4.8,
-                'enrolled_students': 3421,
-                'is_featured': True,
-                'stages': [
-                    {
-                        'title': 'Trading Fundamentals',
-                        'description': 'Learn the basics of trading',
-                        'duration_hours': 3,
-                        'order_index': 1,
-                        'videos': [
-                            {'title': 'Introduction to Trading', 'duration_minutes': 30, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
-                            {'title': 'Market Analysis', 'duration_minutes': 35, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
-                        ]
-                    }
-                ]
-            },
-            {
-                'title': 'Blockchain & Web3',
-                'description': 'Understand blockchain technology, smart contracts, and DeFi',
-                'category': 'Technology',
-                'difficulty': 'Advanced',
-                'duration_weeks': 10,
-                'thumbnail_url': '/src/assets/thumbnails/blockchain_web3.png',
-                'instructor': 'Alex Rodriguez',
-                'average_rating': 4.6,
-                'enrolled_students': 1876,
-                'is_featured': False,
-                'stages': [
-                    {
-                        'title': 'Blockchain Basics',
-                        'description': 'Understanding blockchain technology',
-                        'duration_hours': 4,
-                        'order_index': 1,
-                        'videos': [
-                            {'title': 'What is Blockchain?', 'duration_minutes': 25, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
-                            {'title': 'Cryptocurrency Fundamentals', 'duration_minutes': 30, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
-                        ]
-                    }
-                ]
-            },
-            {
-                'title': 'Digital Marketing',
-                'description': 'Learn SEO, social media marketing, and digital advertising strategies',
-                'category': 'Marketing',
-                'difficulty': 'Beginner',
-                'duration_weeks': 8,
-                'thumbnail_url': '/src/assets/thumbnails/marketing.png',
-                'instructor': 'Emma Thompson',
-                'average_rating': 4.8,
-                'enrolled_students': 4123,
-                'is_featured': True,
-                'stages': [
-                    {
-                        'title': 'Marketing Fundamentals',
-                        'description': 'Learn the basics of digital marketing',
-                        'duration_hours': 3,
-                        'order_index': 1,
-                        'videos': [
-                            {'title': 'Introduction to Digital Marketing', 'duration_minutes': 20, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
-                            {'title': 'Understanding Your Audience', 'duration_minutes': 25, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
-                        ]
-                    }
-                ]
-            },
-            {
-                'title': 'Online Writing',
-                'description': 'Master copywriting, content creation, and freelance writing skills',
-                'category': 'Writing',
-                'difficulty': 'Beginner',
-                'duration_weeks': 6,
-                'thumbnail_url': '/src/assets/thumbnails/online_writing.png',
-                'instructor': 'Lisa Garcia',
-                'average_rating': 4.7,
-                'enrolled_students': 2341,
-                'is_featured': False,
-                'stages': [
-                    {
-                        'title': 'Writing Fundamentals',
-                        'description': 'Learn the basics of effective writing',
-                        'duration_hours': 2,
-                        'order_index': 1,
-                        'videos': [
-                            {'title': 'Writing for the Web', 'duration_minutes': 22, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
-                            {'title': 'Finding Your Voice', 'duration_minutes': 18, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
-                        ]
-                    }
-                ]
-            },
-            {
-                'title': 'Transcription Services',
-                'description': 'Learn professional transcription techniques and tools',
-                'category': 'Services',
-                'difficulty': 'Beginner',
-                'duration_weeks': 4,
-                'thumbnail_url': '/src/assets/thumbnails/transcription.png',
-                'instructor': 'Mark Johnson',
-                'average_rating': 4.5,
-                'enrolled_students': 1654,
-                'is_featured': False,
-                'stages': [
-                    {
-                        'title': 'Transcription Basics',
-                        'description': 'Learn the fundamentals of transcription',
-                        'duration_hours': 2,
-                        'order_index': 1,
-                        'videos': [
-                            {'title': 'Introduction to Transcription', 'duration_minutes': 15, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
-                            {'title': 'Tools and Software', 'duration_minutes': 20, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
-                        ]
-                    }
-                ]
-            },
-            {
-                'title': 'Customer Service Excellence',
-                'description': 'Develop exceptional customer service and communication skills',
-                'category': 'Business',
-                'difficulty': 'Beginner',
-                'duration_weeks': 5,
-                'thumbnail_url': '/src/assets/thumbnails/customer_service.png',
-                'instructor': 'Jennifer Lee',
-                'average_rating': 4.6,
-                'enrolled_students': 2987,
-                'is_featured': False,
-                'stages': [
-                    {
-                        'title': 'Customer Service Fundamentals',
-                        'description': 'Learn the basics of excellent customer service',
-                        'duration_hours': 2,
-                        'order_index': 1,
-                        'videos': [
-                            {'title': 'Understanding Customer Needs', 'duration_minutes': 18, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
-                            {'title': 'Communication Skills', 'duration_minutes': 22, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
-                        ]
-                    }
-                ]
-            },
-            {
-                'title': 'AI & Machine Learning',
-                'description': 'Master artificial intelligence, machine learning, and data science',
-                'category': 'Technology',
-                'difficulty': 'Advanced',
-                'duration_weeks': 16,
-                'thumbnail_url': '/src/assets/thumbnails/ai.png',
-                'instructor': 'Dr. Sarah Chen',
-                'average_rating': 4.9,
-                'enrolled_students': 1923,
-                'is_featured': True,
-                'stages': [
-                    {
-                        'title': 'Introduction to AI',
-                        'description': 'Understanding artificial intelligence fundamentals',
-                        'duration_hours': 3,
-                        'order_index': 1,
-                        'videos': [
-                            {'title': 'What is Artificial Intelligence?', 'duration_minutes': 20, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
-                            {'title': 'History of AI', 'duration_minutes': 25, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2},
-                            {'title': 'AI Applications Today', 'duration_minutes': 30, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 3}
-                        ]
-                    }
-                ]
-            }
-        ]
-        
-        for course_data in courses_data:
-            stages_data = course_data.pop('stages', [])
-            course = Course(**course_data)
-            db.session.add(course)
-            db.session.flush()  # Get course ID
-            
-            for stage_data in stages_data:
-                videos_data = stage_data.pop('videos', [])
-                stage = CourseStage(course_id=course.id, **stage_data)
-                db.session.add(stage)
-                db.session.flush()  # Get stage ID
-                
-                for video_data in videos_data:
-                    video = StageVideo(stage_id=stage.id, **video_data)
-                    db.session.add(video)
-        
-        db.session.commit()
-        print("Courses seeded successfully!")
+    # Configuration
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
+    app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-change-in-production')
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=7)
     
-    # Seed users if they don't exist
-    from src.models.user import User
-    if User.query.count() == 0:
-        print("Seeding users...")
-        
-        # Create admin user
-        admin_user = User(
-            username='admin',
-            first_name='Admin',
-            last_name='User',
-            email='admin@mikelearning.com',
-            is_admin=True
-        )
-        admin_user.set_password('admin123')
-        
-        # Create demo user
-        demo_user = User(
-            username='demouser',
-            first_name='Demo',
-            last_name='User',
-            email='user@mikelearning.com',
-            is_admin=False
-        )
-        demo_user.set_password('user123')
+    # JSON encoding: 'auto' uses orjson when it is installed, 'json' the standard library
+    app.config['JSON_BACKEND'] = os.environ.get('JSON_BACKEND', 'auto')
+    configure_json(app)
+    
+    # Password hashing policy; stored hashes are migrated to it on login
+    app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    app.config['PASSWORD_HASH_THREADS'] = int(os.environ.get('PASSWORD_HASH_THREADS', 2))
+    app.config['PASSWORD_HASH_QUEUE'] = int(os.environ.get('PASSWORD_HASH_QUEUE', 16))
+    password_hasher.init_app(app)
+    
+    # Admin dashboard response cache ('memory' per worker, or 'sqlite' shared by all workers)
+    app.config['RESPONSE_CACHE_BACKEND'] = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    app.config['RESPONSE_CACHE_TTL'] = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+    app.config['RESPONSE_CACHE_SIZE'] = int(os.environ.get('RESPONSE_CACHE_SIZE', 256))
+    app.config['RESPONSE_CACHE_PATH'] = os.environ.get('RESPONSE_CACHE_PATH')
+    admin_cache.init_app(app)
+    
+    # Per-user learning dashboard cache, dropped whenever the user's progress changes
+    app.config['DASHBOARD_CACHE_TTL'] = int(os.environ.get('DASHBOARD_CACHE_TTL', 30))
+    app.config['DASHBOARD_CACHE_SIZE'] = int(os.environ.get('DASHBOARD_CACHE_SIZE', 1024))
+    dashboard_cache.init_app(app, prefix='DASHBOARD_CACHE')
+    
+    # Admin/active flags used by authorization checks, invalidated when they change
+    app.config['PRINCIPAL_CACHE_BACKEND'] = os.environ.get('PRINCIPAL_CACHE_BACKEND', 'memory')
+    app.config['PRINCIPAL_CACHE_TTL'] = int(os.environ.get('PRINCIPAL_CACHE_TTL', 60))
+    app.config['PRINCIPAL_CACHE_SIZE'] = int(os.environ.get('PRINCIPAL_CACHE_SIZE', 4096))
+    principal_cache.init_app(app, prefix='PRINCIPAL_CACHE')
+    
+    # Catalog facet counts per filter combination, dropped on course writes
+    app.config['FACETS_CACHE_TTL'] = int(os.environ.get('FACETS_CACHE_TTL', 300))
+    app.config['FACETS_CACHE_SIZE'] = int(os.environ.get('FACETS_CACHE_SIZE', 512))
+    facets_cache.init_app(app, prefix='FACETS_CACHE')
+    
+    # Login/registration throttling ('<limit>/<seconds>' per rule; 'sqlite' shares counters across workers)
+    app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    app.config['RATE_LIMIT_BACKEND'] = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+    app.config['RATE_LIMIT_PATH'] = os.environ.get('RATE_LIMIT_PATH')
+    app.config['RATE_LIMIT_PROXY_COUNT'] = int(os.environ.get('RATE_LIMIT_PROXY_COUNT', 0))
+    app.config['RATE_LIMIT_LOGIN_IP'] = os.environ.get('RATE_LIMIT_LOGIN_IP', '20/60')
+    app.config['RATE_LIMIT_LOGIN_EMAIL'] = os.environ.get('RATE_LIMIT_LOGIN_EMAIL', '5/300')
+    app.config['RATE_LIMIT_REGISTER_IP'] = os.environ.get('RATE_LIMIT_REGISTER_IP', '10/3600')
+    rate_limiter.init_app(app)
+    
+    # Watch heartbeats are coalesced in memory and flushed in bulk on this interval (seconds)
+    app.config['PROGRESS_FLUSH_INTERVAL'] = float(os.environ.get('PROGRESS_FLUSH_INTERVAL', 2.0))
+    app.config['PROGRESS_FLUSH_MAX_PENDING'] = int(os.environ.get('PROGRESS_FLUSH_MAX_PENDING', 5000))
+    app.config['PROGRESS_FLUSH_MAX_ATTEMPTS'] = int(os.environ.get('PROGRESS_FLUSH_MAX_ATTEMPTS', 3))
+    heartbeat_buffer.init_app(app)
+    
+    # Serve the SPA from a manifest of the static folder built at startup (restart after a new build)
+    app.config['STATIC_MANIFEST'] = os.environ.get('STATIC_MANIFEST', 'true').lower() in ('1', 'true', 'yes')
+    
+    register_commands(app)
+    
+    # Enable CORS for all routes
+    CORS(app, origins=['http://localhost:5173', 'http://localhost:5174', 'http://localhost:3000'], supports_credentials=True)
+    
+    # Initialize JWT
+    JWTManager(app)
+    
+    # Register blueprints
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(auth_bp, url_prefix='/api')
+    app.register_blueprint(courses_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api')
+    app.register_blueprint(progress_bp, url_prefix='/api')
+    
+    # Database configuration (DATABASE_URL, pool options and SQLite pragmas, see src/config.py)
+    configure_database(app)
+    db.init_app(app)
+    with app.app_context():
+        # Engines connect lazily, so this only registers the connect hooks
+        install_engine_pragmas(app, db.engines)
+    
+    # Health check endpoint
+    @app.route('/api/health', methods=['GET'])
+    def health_check():
+        return jsonify({'status': 'healthy', 'message': 'Mike Learning API is running'}), 200
+    
+    static_manifest = StaticManifest(app.static_folder) if app.config['STATIC_MANIFEST'] else None
+    
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        if static_manifest is not None:
+            # Unknown paths are client-side routes
+            entry = static_manifest.get(path) or static_manifest.get('index.html')
+            if entry is None:
+                return "index.html not found", 404
+            return static_manifest.send(entry)
         
-        db.session.add(admin_user)
-        db.session.add(demo_user)
-        db.session.commit()
-        print("Users seeded successfully!")
-
-# Health check endpoint
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    return jsonify({'status': 'healthy', 'message': 'Mike Learning API is running'}), 200
-
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
+        static_folder_path = app.static_folder
+        if static_folder_path is None:
+                return "Static folder not configured", 404
+    
+        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
+            return send_from_directory(static_folder_path, path)
         else:
-            return "index.html not found", 404
+            index_path = os.path.join(static_folder_path, 'index.html')
+            if os.path.exists(index_path):
+                return send_from_directory(static_folder_path, 'index.html')
+            else:
+                return "index.html not found", 404
+    
+    return app
+
+# Module-level app for ``gunicorn src.main:app``; creating it does no database work
+app = create_app()
 
 if __name__ == '__main__':
+    # Development server: prepare the database the way ``flask init-db --seed`` does
+    with app.app_context():
+        init_database()
+        seed_database()
     app.run(host='0.0.0.0', port=5000, debug=True)
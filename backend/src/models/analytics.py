@@ -0,0 +1,44 @@
+from src.models.user import db
+
+class DailyRegistrations(db.Model):
+    """Users registered per day"""
+    __tablename__ = 'analytics_daily_registrations'
+
+    day = db.Column(db.Date, primary_key=True)
+    registrations = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'date': self.day.isoformat(),
+            'registrations': self.registrations
+        }
+
+class DailyCourseActivity(db.Model):
+    """Enrollments and completions per course per day"""
+    __tablename__ = 'analytics_daily_course_activity'
+
+    day = db.Column(db.Date, primary_key=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.id'), primary_key=True)
+    enrollments = db.Column(db.Integer, nullable=False, default=0)
+    completions = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'date': self.day.isoformat(),
+            'course_id': self.course_id,
+            'enrollments': self.enrollments,
+            'completions': self.completions
+        }
+
+class AnalyticsTotal(db.Model):
+    """Running platform-wide counters (total users, active users, enrollments)"""
+    __tablename__ = 'analytics_totals'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'value': self.value
+        }
@@ -18,7 +18,8 @@ class Course(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    stages = db.relationship('CourseStage', backref='course', lazy=True, cascade='all, delete-orphan')
+    stages = db.relationship('CourseStage', backref='course', lazy=True, cascade='all, delete-orphan',
+                             order_by='CourseStage.order_index')
     enrollments = db.relationship('UserCourseProgress', backref='course', lazy=True)
 
     def __repr__(self):
@@ -44,7 +45,8 @@ class Course(db.Model):
         }
         
         if include_stages:
-            data['stages'] = [stage.to_dict() for stage in sorted(self.stages, key=lambda x: x.order_index)]
+            # Relationship is declared with order_by, so stages arrive already ordered
+            data['stages'] = [stage.to_dict() for stage in self.stages]
         
         return data
 
@@ -59,7 +61,8 @@ class CourseStage(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
-    videos = db.relationship('StageVideo', backref='stage', lazy=True, cascade='all, delete-orphan')
+    videos = db.relationship('StageVideo', backref='stage', lazy=True, cascade='all, delete-orphan',
+                             order_by='StageVideo.order_index')
     progress_records = db.relationship('UserStageProgress', backref='stage', lazy=True)
 
     def __repr__(self):
@@ -75,7 +78,7 @@ class CourseStage(db.Model):
             'order_index': self.order_index,
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'videos': [video.to_dict() for video in sorted(self.videos, key=lambda x: x.order_index)]
+            'videos': [video.to_dict() for video in self.videos]
         }
 
 class StageVideo(db.Model):
@@ -110,3 +113,26 @@ class StageVideo(db.Model):
             'embed_url': f'https://www.youtube.com/embed/{self.youtube_id}'
         }
 
+class CatalogVersion(db.Model):
+    """Write counter per course; course_id 0 counts every catalog change, -1 counter updates (HTTP ETags)"""
+    __tablename__ = 'catalog_versions'
+
+    course_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# Natural keys of stages and videos: ordered children lookups, catalog
+# imports and the search index triggers all filter on the parent id
+db.Index('ix_course_stage_course_order', CourseStage.course_id, CourseStage.order_index)
+db.Index('ix_stage_video_stage_order', StageVideo.stage_id, StageVideo.order_index)
+
+# Catalog filters (category, then difficulty and featured) over active courses
+# only; partial on SQLite and Postgres, so inactive courses cost no index space
+db.Index('ix_course_active_filters', Course.category, Course.difficulty, Course.is_featured,
+         sqlite_where=Course.is_active == True, postgresql_where=Course.is_active == True)
+
+# Default catalog order (featured first, then by id) over active courses: the
+# first listing page and every keyset page after it are ranges of this index.
+# Partial like ix_course_active_filters rather than led by is_active, which
+# the planner would otherwise seek for every active-course query it serves
+db.Index('ix_course_active_featured', Course.is_featured.desc(), Course.id,
+         sqlite_where=Course.is_active == True, postgresql_where=Course.is_active == True)
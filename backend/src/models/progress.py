@@ -11,6 +11,9 @@ class UserCourseProgress(db.Model):
     current_stage_id = db.Column(db.Integer, db.ForeignKey('course_stage.id'), nullable=True)
     progress_percentage = db.Column(db.Float, default=0.0)  # Overall course progress
     last_accessed = db.Column(db.DateTime, default=datetime.utcnow)
+    # Incrementally maintained counters behind progress_percentage
+    completed_stages = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    completed_minutes = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relationships
     stage_progress = db.relationship('UserStageProgress', backref='course_progress', lazy=True)
@@ -31,6 +34,7 @@ class UserCourseProgress(db.Model):
             'is_completed': self.is_completed,
             'current_stage_id': self.current_stage_id,
             'progress_percentage': self.progress_percentage,
+            'completed_stages': self.completed_stages,
             'last_accessed': self.last_accessed.isoformat() if self.last_accessed else None
         }
 
@@ -44,6 +48,9 @@ class UserStageProgress(db.Model):
     is_completed = db.Column(db.Boolean, default=False)
     progress_percentage = db.Column(db.Float, default=0.0)  # Stage progress based on videos watched
     last_accessed = db.Column(db.DateTime, default=datetime.utcnow)
+    # Incrementally maintained counters behind progress_percentage
+    completed_videos = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    completed_minutes = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relationships
     video_progress = db.relationship('UserVideoProgress', backref='stage_progress', lazy=True)
@@ -64,6 +71,7 @@ class UserStageProgress(db.Model):
             'completion_date': self.completion_date.isoformat() if self.completion_date else None,
             'is_completed': self.is_completed,
             'progress_percentage': self.progress_percentage,
+            'completed_videos': self.completed_videos,
             'last_accessed': self.last_accessed.isoformat() if self.last_accessed else None
         }
 
@@ -99,3 +107,6 @@ class UserVideoProgress(db.Model):
             'last_watched': self.last_watched.isoformat() if self.last_watched else None
         }
 
+# Per-course enrollment and completion counts (admin course stats); the unique
+# (user_id, course_id) constraint only serves lookups by user
+db.Index('ix_user_course_progress_course', UserCourseProgress.course_id, UserCourseProgress.is_completed)
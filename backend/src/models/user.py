@@ -1,8 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from src.db_routing import RoutingSession
+from src.services.passwords import password_hasher
 
-db = SQLAlchemy()
+# RoutingSession can send SELECTs of read-only requests to a read engine
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -26,11 +28,15 @@ class User(db.Model):
 
     def set_password(self, password):
         """Hash and set the user's password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
         """Check if the provided password matches the user's password"""
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """Whether the stored hash was made with a different hashing policy"""
+        return password_hasher.needs_rehash(self.password_hash)
 
     def to_dict(self, include_sensitive=False):
         data = {
@@ -57,3 +63,9 @@ class User(db.Model):
     def get_course_progress(self, course_id):
         """Get user's progress for a specific course"""
         return next((progress for progress in self.course_progress if progress.course_id == course_id), None)
+
+# Expression indexes backing prefix search in the admin user directory
+db.Index('ix_user_email_lower', db.func.lower(User.email))
+db.Index('ix_user_username_lower', db.func.lower(User.username))
+db.Index('ix_user_first_name_lower', db.func.lower(User.first_name))
+db.Index('ix_user_last_name_lower', db.func.lower(User.last_name))
@@ -1,23 +1,38 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
+from flask_jwt_extended import jwt_required
 from src.models.user import User, db
-from src.models.course import Course, CourseStage, StageVideo
-from src.models.progress import UserCourseProgress, UserStageProgress, UserVideoProgress
-from datetime import datetime, timedelta
-from sqlalchemy import func
+from src.db_routing import read_only
+from src.models.course import Course
+from src.models.progress import UserCourseProgress
+from src.services.content_io import export_courses, import_courses
+from src.services.principals import current_principal, invalidate_principal
+from src.services.progress_ingest import heartbeat_buffer
+from src.services.enrollment import MAX_BULK_ENROLL, enroll_users
+from src.services.admin_stats import admin_course_stats, enrollment_counts_by_user
+from src.services.rate_limit import rate_limiter
+from src.services.response_cache import admin_cache
+from src.services.rollups import analytics_summary
+from src.services.user_search import user_search_filter
 
 admin_bp = Blueprint('admin', __name__)
 
 def require_admin():
     """Decorator to check if user is admin"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    # Served from the principal cache; no database query on a hit
+    principal = current_principal()
     
-    if not user or not user.is_admin:
+    if not principal or not principal.is_admin or not principal.is_active:
         return jsonify({'error': 'Admin access required'}), 403
     
     return None
 
+def cached_json(group, build):
+    """Serve a JSON body from the admin cache, calling ``build()`` on a miss"""
+    payload = admin_cache.get_or_compute(
+        group, request.full_path, lambda: current_app.json.dumps(build())
+    )
+    return current_app.response_class(payload, status=200, mimetype='application/json')
+
 @admin_bp.route('/admin/users', methods=['GET'])
 @jwt_required()
 def get_users():
@@ -26,51 +41,52 @@ def get_users():
         return admin_check
     
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        search = request.args.get('search', '')
-        
-        query = User.query
-        
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                db.or_(
-                    User.email.ilike(search_term),
-                    User.first_name.ilike(search_term),
-                    User.last_name.ilike(search_term),
-                    User.username.ilike(search_term)
-                )
+        def build_users_page():
+            page = request.args.get('page', 1, type=int)
+            per_page = request.args.get('per_page', 20, type=int)
+            search = request.args.get('search', '')
+            search_mode = request.args.get('search_mode', 'substring')
+            
+            query = User.query
+            
+            if search:
+                # Substring search (the default) uses the trigram index when
+                # available; opt-in prefix search uses the lower() expression indexes
+                query = query.filter(user_search_filter(search, search_mode))
+            
+            users = query.paginate(
+                page=page, 
+                per_page=per_page, 
+                error_out=False
             )
-        
-        users = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
-        
-        users_data = []
-        for user in users.items:
-            user_data = user.to_dict()
-            # Add enrollment count
-            user_data['enrollments_count'] = len(user.course_progress)
-            # Add completion stats
-            completed_courses = len([p for p in user.course_progress if p.completion_percentage >= 100])
-            user_data['completed_courses'] = completed_courses
-            users_data.append(user_data)
-        
-        return jsonify({
-            'users': users_data,
-            'pagination': {
-                'page': users.page,
-                'pages': users.pages,
-                'per_page': users.per_page,
-                'total': users.total,
-                'has_next': users.has_next,
-                'has_prev': users.has_prev
+            
+            # Enrollment and completion counts for the whole page in one grouped query
+            counts = enrollment_counts_by_user([user.id for user in users.items])
+            
+            users_data = []
+            for user in users.items:
+                user_data = user.to_dict()
+                enrollments_count, completed_courses = counts.get(user.id, (0, 0))
+                user_data['enrollments_count'] = enrollments_count
+                user_data['completed_courses'] = completed_courses
+                users_data.append(user_data)
+            
+            return {
+                'users': users_data,
+                'pagination': {
+                    'page': users.page,
+                    'pages': users.pages,
+                    'per_page': users.per_page,
+                    'total': users.total,
+                    'has_next': users.has_next,
+                    'has_prev': users.has_prev
+                }
             }
-        }), 200
         
+        return cached_json('admin_users', build_users_page)
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -88,19 +104,19 @@ def get_user_detail(user_id):
         
         user_data = user.to_dict()
         
-        # Add detailed progress information
+        # Add detailed progress information, with each enrollment's course in the same query
         enrollments = []
-        for progress in user.course_progress:
-            course = progress.course
-            if course:
-                enrollments.append({
-                    'course_id': course.id,
-                    'course_title': course.title,
-                    'course_category': course.category,
-                    'completion_percentage': progress.completion_percentage,
-                    'enrolled_at': progress.enrolled_at.isoformat(),
-                    'last_accessed': progress.last_accessed.isoformat() if progress.last_accessed else None
-                })
+        for progress, course in db.session.query(UserCourseProgress, Course).join(
+            Course, Course.id == UserCourseProgress.course_id
+        ).filter(UserCourseProgress.user_id == user_id).order_by(UserCourseProgress.id):
+            enrollments.append({
+                'course_id': course.id,
+                'course_title': course.title,
+                'course_category': course.category,
+                'completion_percentage': progress.progress_percentage or 0.0,
+                'enrolled_at': progress.enrollment_date.isoformat() if progress.enrollment_date else None,
+                'last_accessed': progress.last_accessed.isoformat() if progress.last_accessed else None
+            })
         
         user_data['enrollments'] = enrollments
         
@@ -134,6 +150,8 @@ def update_user(user_id):
             user.last_name = data['last_name']
         
         db.session.commit()
+        invalidate_principal(user.id)
+        admin_cache.invalidate('admin_users', 'admin_analytics')
         
         return jsonify({
             'message': 'User updated successfully',
@@ -146,125 +164,30 @@ def update_user(user_id):
 
 @admin_bp.route('/admin/analytics', methods=['GET'])
 @jwt_required()
+@read_only
 def get_analytics():
     admin_check = require_admin()
     if admin_check:
         return admin_check
     
     try:
-        # Basic statistics
-        total_users = User.query.count()
-        active_users = User.query.filter_by(is_active=True).count()
-        total_courses = Course.query.filter_by(is_active=True).count()
-        total_enrollments = UserCourseProgress.query.count()
-        
-        # Recent registrations (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_registrations = User.query.filter(
-            User.created_at >= thirty_days_ago
-        ).count()
-        
-        # Course popularity
-        course_stats = db.session.query(
-            Course.id,
-            Course.title,
-            Course.category,
-            Course.enrolled_students,
-            Course.average_rating,
-            func.count(UserCourseProgress.id).label('actual_enrollments')
-        ).outerjoin(UserCourseProgress).filter(
-            Course.is_active == True
-        ).group_by(Course.id).all()
-        
-        course_data = []
-        for stat in course_stats:
-            course_data.append({
-                'id': stat[0],
-                'title': stat[1],
-                'category': stat[2],
-                'enrolled_students': stat[3],
-                'average_rating': stat[4],
-                'actual_enrollments': stat[5]
-            })
-        
-        # Completion rates by course
-        completion_stats = db.session.query(
-            Course.title,
-            func.count(UserCourseProgress.id).label('total_enrollments'),
-            func.count(
-                func.case([(UserCourseProgress.completion_percentage >= 100, 1)])
-            ).label('completions')
-        ).join(UserCourseProgress).filter(
-            Course.is_active == True
-        ).group_by(Course.id, Course.title).all()
-        
-        completion_data = []
-        for stat in completion_stats:
-            completion_rate = (stat[2] / stat[1] * 100) if stat[1] > 0 else 0
-            completion_data.append({
-                'course_title': stat[0],
-                'total_enrollments': stat[1],
-                'completions': stat[2],
-                'completion_rate': round(completion_rate, 2)
-            })
-        
-        # User activity (enrollments per day for last 30 days)
-        activity_data = db.session.query(
-            func.date(UserCourseProgress.enrolled_at).label('date'),
-            func.count(UserCourseProgress.id).label('enrollments')
-        ).filter(
-            UserCourseProgress.enrolled_at >= thirty_days_ago
-        ).group_by(func.date(UserCourseProgress.enrolled_at)).all()
-        
-        activity_chart = [
-            {
-                'date': stat[0].isoformat(),
-                'enrollments': stat[1]
-            } for stat in activity_data
-        ]
-        
-        return jsonify({
-            'overview': {
-                'total_users': total_users,
-                'active_users': active_users,
-                'total_courses': total_courses,
-                'total_enrollments': total_enrollments,
-                'recent_registrations': recent_registrations
-            },
-            'course_stats': course_data,
-            'completion_stats': completion_data,
-            'activity_chart': activity_chart
-        }), 200
+        # Served from the incrementally maintained rollup tables
+        return cached_json('admin_analytics', analytics_summary)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/admin/courses', methods=['GET'])
 @jwt_required()
+@read_only
 def get_admin_courses():
     admin_check = require_admin()
     if admin_check:
         return admin_check
     
     try:
-        courses = Course.query.all()
-        
-        courses_data = []
-        for course in courses:
-            course_data = course.to_dict()
-            # Add enrollment statistics
-            enrollments = UserCourseProgress.query.filter_by(course_id=course.id).count()
-            completions = UserCourseProgress.query.filter_by(
-                course_id=course.id
-            ).filter(UserCourseProgress.completion_percentage >= 100).count()
-            
-            course_data['actual_enrollments'] = enrollments
-            course_data['completions'] = completions
-            course_data['completion_rate'] = (completions / enrollments * 100) if enrollments > 0 else 0
-            
-            courses_data.append(course_data)
-        
-        return jsonify({'courses': courses_data}), 200
+        # Stage counts, enrollments and completions for every course in one query
+        return cached_json('admin_courses', lambda: {'courses': admin_course_stats()})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -283,6 +206,7 @@ def toggle_course_active(course_id):
         
         course.is_active = not course.is_active
         db.session.commit()
+        admin_cache.invalidate('admin_courses', 'admin_analytics')
         
         return jsonify({
             'message': f'Course {"activated" if course.is_active else "deactivated"} successfully',
@@ -307,6 +231,7 @@ def toggle_course_featured(course_id):
         
         course.is_featured = not course.is_featured
         db.session.commit()
+        admin_cache.invalidate('admin_courses', 'admin_analytics')
         
         return jsonify({
             'message': f'Course {"featured" if course.is_featured else "unfeatured"} successfully',
@@ -317,3 +242,105 @@ def toggle_course_featured(course_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+
+@admin_bp.route('/admin/courses/<int:course_id>/enrollments', methods=['POST'])
+@jwt_required()
+def bulk_enroll(course_id):
+    admin_check = require_admin()
+    if admin_check:
+        return admin_check
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        user_ids = data.get('user_ids')
+        
+        if not isinstance(user_ids, list) or not user_ids:
+            return jsonify({'error': 'user_ids must be a non-empty list'}), 400
+        if len(user_ids) > MAX_BULK_ENROLL:
+            return jsonify({'error': f'At most {MAX_BULK_ENROLL} user_ids per request'}), 400
+        if not all(isinstance(user_id, int) and not isinstance(user_id, bool) for user_id in user_ids):
+            return jsonify({'error': 'user_ids must be integers'}), 400
+        
+        course = Course.query.get(course_id)
+        if not course:
+            return jsonify({'error': 'Course not found'}), 404
+        
+        # One transaction: a bulk insert that skips existing enrollments and a
+        # single increment of the course's enrolled_students counter
+        enrolled, already_enrolled, unknown = enroll_users(course_id, user_ids)
+        if enrolled:
+            admin_cache.invalidate('admin_courses', 'admin_analytics', 'admin_users')
+        
+        return jsonify({
+            'course_id': course_id,
+            'enrolled': len(enrolled),
+            'already_enrolled': len(already_enrolled),
+            'unknown_user_ids': unknown
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/courses/export', methods=['GET'])
+@jwt_required()
+def export_course_catalog():
+    admin_check = require_admin()
+    if admin_check:
+        return admin_check
+    
+    include_inactive = request.args.get('include_inactive', 'true').lower() != 'false'
+    # Streamed page by page, one NDJSON line per course
+    return current_app.response_class(
+        stream_with_context(export_courses(include_inactive=include_inactive)),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=courses.ndjson'}
+    )
+
+@admin_bp.route('/admin/courses/import', methods=['POST'])
+@jwt_required()
+def import_course_catalog():
+    admin_check = require_admin()
+    if admin_check:
+        return admin_check
+    
+    try:
+        # The request body is read line by line, never buffered whole
+        stats = import_courses(request.stream)
+        admin_cache.invalidate('admin_courses', 'admin_analytics')
+        return jsonify({'message': 'Import completed', 'stats': stats}), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/cache/stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    admin_check = require_admin()
+    if admin_check:
+        return admin_check
+    
+    return jsonify({'cache': admin_cache.stats()}), 200
+
+@admin_bp.route('/admin/rate-limits/stats', methods=['GET'])
+@jwt_required()
+def get_rate_limit_stats():
+    admin_check = require_admin()
+    if admin_check:
+        return admin_check
+    
+    return jsonify({'rate_limits': rate_limiter.stats()}), 200
+
+@admin_bp.route('/admin/progress/stats', methods=['GET'])
+@jwt_required()
+def get_progress_stats():
+    admin_check = require_admin()
+    if admin_check:
+        return admin_check
+    
+    return jsonify({'progress_buffer': heartbeat_buffer.stats()}), 200
@@ -1,13 +1,24 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from src.models.user import User, db
+from src.services.passwords import PasswordHasherBusy
+from src.services.principals import invalidate_principal
+from src.services.rate_limit import rate_limiter
 from datetime import datetime, timedelta
 
 auth_bp = Blueprint('auth', __name__)
 
+def _too_many_requests(retry_after, message='Too many requests, please try again later'):
+    return jsonify({'error': message, 'retry_after': retry_after}), 429, {'Retry-After': str(retry_after)}
+
 @auth_bp.route('/auth/register', methods=['POST'])
 def register():
     try:
+        # Throttled before any database work
+        retry_after = rate_limiter.hit('register_ip', rate_limiter.client_ip())
+        if retry_after:
+            return _too_many_requests(retry_after)
+        
         data = request.get_json()
         
         # Validate required fields
@@ -56,14 +67,29 @@ def login():
         if not data.get('email') or not data.get('password'):
             return jsonify({'error': 'Email and password are required'}), 400
         
+        # Throttled per client and locked per account before any User query or hash check
+        retry_after = rate_limiter.hit('login_ip', rate_limiter.client_ip())
+        if retry_after:
+            return _too_many_requests(retry_after)
+        email_key = data['email'].strip().lower()
+        retry_after = rate_limiter.peek('login_email', email_key)
+        if retry_after:
+            return _too_many_requests(retry_after, 'Too many failed login attempts, please try again later')
+        
         user = User.query.filter_by(email=data['email']).first()
         
         if not user or not user.check_password(data['password']):
+            rate_limiter.hit('login_email', email_key)
             return jsonify({'error': 'Invalid email or password'}), 401
+        rate_limiter.reset('login_email', email_key)
         
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 401
         
+        # Bring the stored hash in line with the current hashing policy
+        if user.password_needs_rehash():
+            user.set_password(data['password'])
+        
         # Update last login
         user.last_login = datetime.utcnow()
         db.session.commit()
@@ -79,6 +105,8 @@ def login():
             'user': user.to_dict()
         }), 200
         
+    except PasswordHasherBusy:
+        return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -154,9 +182,12 @@ def change_password():
         
         user.set_password(data['new_password'])
         db.session.commit()
+        invalidate_principal(user.id)
         
         return jsonify({'message': 'Password changed successfully'}), 200
         
+    except PasswordHasherBusy:
+        return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
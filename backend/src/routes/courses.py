@@ -1,10 +1,23 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.course import Course, CourseStage, StageVideo
-from src.database import db
+from src.models.user import db
+from src.db_routing import route_reads
+from src.models.progress import UserCourseProgress
+from src.services.course_tree import get_course_payload
+from src.services.enrollment import enroll_users
+from src.services.facets import catalog_facets
+from src.services.response_cache import admin_cache
+from src.services.catalog_version import content_version, listing_version, not_modified, version_etag, with_etag
+from src.services.catalog import active_categories_query, listing_query, listing_rows_to_dicts, paginate_listing, parse_fields
+from src.services.search import search_courses, search_filter
 from datetime import datetime
 
 courses_bp = Blueprint('courses', __name__)
 
+# Catalog reads (listing, search, detail, categories) use the read engine
+route_reads(courses_bp)
+
 @courses_bp.route('/courses', methods=['GET'])
 def get_courses():
     try:
@@ -13,9 +26,20 @@ def get_courses():
         difficulty = request.args.get('difficulty')
         featured = request.args.get('featured')
         search = request.args.get('search')
+        sort = request.args.get('sort')
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        
+        # A client holding the current catalog and counter versions gets a 304 before any query is built
+        etag = version_etag(listing_version())
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
         
-        # Build query
-        query = Course.query.filter_by(is_active=True)
+        # Build query over the listing columns only; stage counts come from
+        # a correlated count per course instead of loading each course's stages
+        columns, include_stage_counts = parse_fields(request.args.get('fields'))
+        query = listing_query(columns, include_stage_counts)
         
         if category and category != 'All':
             query = query.filter(Course.category == category)
@@ -27,73 +51,140 @@ def get_courses():
             query = query.filter(Course.is_featured == True)
         
         if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                db.or_(
-                    Course.title.ilike(search_term),
-                    Course.description.ilike(search_term),
-                    Course.instructor.ilike(search_term)
-                )
-            )
+            # Matches against the FTS index when available instead of scanning
+            query = query.filter(search_filter(search))
+        
+        # Keyset pagination: pass next_cursor back as cursor for the next page
+        rows, next_cursor = paginate_listing(query, sort=sort, limit=limit, cursor=cursor)
+        
+        response = {
+            'courses': listing_rows_to_dicts(rows)
+        }
+        if limit is not None:
+            response['pagination'] = {
+                'limit': limit,
+                'next_cursor': next_cursor,
+                'has_next': next_cursor is not None
+            }
+        
+        return with_etag(jsonify(response), etag), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@courses_bp.route('/search/courses', methods=['GET'])
+def search_courses_ranked():
+    try:
+        term = request.args.get('q', '')
+        limit = request.args.get('limit', 10, type=int)
         
-        courses = query.all()
+        if not 1 <= limit <= 50:
+            return jsonify({'error': 'limit must be between 1 and 50'}), 400
         
+        # Ranked by BM25 with a highlighted snippet; the last word matches as a
+        # prefix so this endpoint can back typeahead
         return jsonify({
-            'courses': [course.to_dict() for course in courses]
+            'query': term,
+            'results': search_courses(term, limit=limit)
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@courses_bp.route('/courses/facets', methods=['GET'])
+def get_course_facets():
+    try:
+        version = content_version()
+        etag = version_etag(version)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+        
+        # Counts for the sidebar under the same filters as /courses, cached per combination
+        payload = catalog_facets(
+            version,
+            category=request.args.get('category'),
+            difficulty=request.args.get('difficulty'),
+            featured=request.args.get('featured'),
+            search=request.args.get('search')
+        )
+        return with_etag(current_app.response_class(payload, status=200, mimetype='application/json'), etag)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @courses_bp.route('/courses/<int:course_id>', methods=['GET'])
 def get_course(course_id):
     try:
-        course = Course.query.get(course_id)
-        
-        if not course or not course.is_active:
+        # Revalidation costs one version lookup; the course is only loaded when it changed
+        version = content_version(course_id)
+        etag = version_etag(version, course_id)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+        
+        # Course, stages and videos are loaded in a fixed number of queries
+        # and the serialized body is cached until the course content changes
+        payload = get_course_payload(course_id, version)
+        
+        if payload is None:
             return jsonify({'error': 'Course not found'}), 404
         
-        # Get course data with stages and videos
-        course_data = course.to_dict(include_stages=True)
-        
-        return jsonify({
-            'course': course_data,
-            'enrolled': False,  # No authentication, so always false
-            'progress': {
-                'completion_percentage': 0,
-                'last_accessed': None,
-                'enrolled_at': None
-            }
-        }), 200
+        return with_etag(current_app.response_class(payload, status=200, mimetype='application/json'), etag)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @courses_bp.route('/courses/<int:course_id>/enroll', methods=['POST'])
+@jwt_required()
 def enroll_course(course_id):
     try:
+        user_id = int(get_jwt_identity())
+        
         # Check if course exists and is active
         course = Course.query.get(course_id)
         if not course or not course.is_active:
             return jsonify({'error': 'Course not found'}), 404
         
-        # Since we removed authentication, just return success
-        # In a real app, you might want to track enrollments differently
-        return jsonify({'message': 'Successfully enrolled in course'}), 201
+        # Idempotent: enrolling twice returns the existing enrollment
+        enrolled, _, unknown = enroll_users(course_id, [user_id])
+        if unknown:
+            return jsonify({'error': 'User not found'}), 404
+        if enrolled:
+            admin_cache.invalidate('admin_courses', 'admin_analytics', 'admin_users')
+        
+        progress = UserCourseProgress.query.filter_by(user_id=user_id, course_id=course_id).first()
+        return jsonify({
+            'message': 'Successfully enrolled in course' if enrolled else 'Already enrolled in course',
+            'enrollment': {
+                'course_id': course_id,
+                'user_id': user_id,
+                'enrolled_at': progress.enrollment_date.isoformat() if progress.enrollment_date else None,
+                'progress': progress.progress_percentage or 0.0
+            }
+        }), 201 if enrolled else 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @courses_bp.route('/categories', methods=['GET'])
 def get_categories():
     try:
+        etag = version_etag(content_version())
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+        
         # Get unique categories from active courses
-        categories = db.session.query(Course.category).filter_by(is_active=True).distinct().all()
+        categories = active_categories_query().all()
         category_list = [cat[0] for cat in categories if cat[0]]
         
-        return jsonify({
+        return with_etag(jsonify({
             'categories': sorted(category_list)
-        }), 200
+        }), etag), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,66 @@
+import math
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.services.progress_ingest import heartbeat_buffer
+
+progress_bp = Blueprint('progress', __name__)
+
+MAX_HEARTBEATS_PER_REQUEST = 500
+
+def _is_seconds(value):
+    """A finite, non-negative JSON number; booleans, NaN and Infinity are rejected"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value) and value >= 0
+
+def _parse_heartbeat(item):
+    """Validate one heartbeat; returns a normalized dict or raises ValueError"""
+    if not isinstance(item, dict):
+        raise ValueError('Each heartbeat must be an object')
+    
+    video_id = item.get('video_id')
+    position = item.get('position_seconds')
+    watched = item.get('watched_seconds', 0)
+    
+    if not isinstance(video_id, int) or isinstance(video_id, bool):
+        raise ValueError('video_id must be an integer')
+    if not _is_seconds(position):
+        raise ValueError('position_seconds must be a non-negative number')
+    if not _is_seconds(watched):
+        raise ValueError('watched_seconds must be a non-negative number')
+    
+    return {
+        'video_id': video_id,
+        'position_seconds': int(position),
+        'watched_seconds': int(watched),
+        'completed': bool(item.get('completed', False))
+    }
+
+@progress_bp.route('/progress/heartbeats', methods=['POST'])
+@jwt_required()
+def post_heartbeats():
+    try:
+        user_id = int(get_jwt_identity())
+        data = request.get_json(silent=True) or {}
+        items = data.get('heartbeats')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'heartbeats must be a non-empty list'}), 400
+        if len(items) > MAX_HEARTBEATS_PER_REQUEST:
+            return jsonify({'error': f'At most {MAX_HEARTBEATS_PER_REQUEST} heartbeats per request'}), 400
+        
+        heartbeats = [_parse_heartbeat(item) for item in items]
+        
+        # Buffered and coalesced per (user, video); written by the periodic flush
+        accepted = heartbeat_buffer.add(user_id, heartbeats)
+        if not accepted:
+            # The buffer is full until the next flush makes room
+            retry_after = max(1, math.ceil(heartbeat_buffer.flush_interval))
+            return jsonify({'error': 'Progress buffer is full, please retry', 'retry_after': retry_after}), 503, {
+                'Retry-After': str(retry_after)
+            }
+        
+        return jsonify({'accepted': accepted}), 202
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
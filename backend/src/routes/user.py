@@ -1,8 +1,27 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.user import User, db
+from src.services.dashboard import user_dashboard
+from src.services.principals import invalidate_principal
+from src.services.response_cache import dashboard_cache, user_group
 
 user_bp = Blueprint('user', __name__)
 
+@user_bp.route('/users/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    try:
+        user_id = int(get_jwt_identity())
+        # Cached per user for a few seconds; progress writes drop the entry
+        payload = dashboard_cache.get_or_compute(
+            user_group(user_id), 'dashboard',
+            lambda: current_app.json.dumps(user_dashboard(user_id))
+        )
+        return current_app.response_class(payload, status=200, mimetype='application/json')
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @user_bp.route('/users', methods=['GET'])
 def get_users():
     users = User.query.all()
@@ -36,4 +55,5 @@ def delete_user(user_id):
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
     db.session.commit()
+    invalidate_principal(user_id)
     return '', 204
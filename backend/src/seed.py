@@ -0,0 +1,314 @@
+"""Demo catalog and accounts for a fresh database (``flask seed``)"""
+from sqlalchemy import insert
+from src.models.user import User, db
+from src.models.course import Course, CourseStage, StageVideo
+from src.services.catalog_events import mark_catalog_changed
+from src.services.passwords import password_hasher
+from src.services.rollups import rebuild_rollups
+
+COURSES = [
+    {
+        'title': 'Web Development Mastery',
+        'description': 'Learn modern web development with React, Node.js, and database integration',
+        'category': 'Development',
+        'difficulty': 'Beginner',
+        'duration_weeks': 12,
+        'thumbnail_url': '/src/assets/thumbnails/web_development.png',
+        'instructor': 'Mike Johnson',
+        'average_rating': 4.9,
+        'enrolled_students': 2847,
+        'is_featured': True,
+        'stages': [
+            {
+                'title': 'Introduction to Web Development',
+                'description': 'Get started with the basics of web development',
+                'duration_hours': 2,
+                'order_index': 1,
+                'videos': [
+                    {'title': 'What is Web Development?', 'duration_minutes': 15, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
+                    {'title': 'Setting Up Your Environment', 'duration_minutes': 22, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2},
+                    {'title': 'Your First HTML Page', 'duration_minutes': 18, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 3}
+                ]
+            },
+            {
+                'title': 'HTML Fundamentals',
+                'description': 'Master HTML structure and semantic elements',
+                'duration_hours': 3,
+                'order_index': 2,
+                'videos': [
+                    {'title': 'HTML Structure and Tags', 'duration_minutes': 25, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
+                    {'title': 'Forms and Input Elements', 'duration_minutes': 30, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2},
+                    {'title': 'Semantic HTML', 'duration_minutes': 20, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 3}
+                ]
+            }
+        ]
+    },
+    {
+        'title': 'Blog Development',
+        'description': 'Create engaging blogs with modern CMS and content strategies',
+        'category': 'Development',
+        'difficulty': 'Beginner',
+        'duration_weeks': 6,
+        'thumbnail_url': '/src/assets/thumbnails/blog_development.png',
+        'instructor': 'Sarah Wilson',
+        'average_rating': 4.7,
+        'enrolled_students': 1523,
+        'is_featured': False,
+        'stages': [
+            {
+                'title': 'Blog Basics',
+                'description': 'Understanding blog fundamentals',
+                'duration_hours': 2,
+                'order_index': 1,
+                'videos': [
+                    {'title': 'What Makes a Great Blog?', 'duration_minutes': 20, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
+                    {'title': 'Choosing Your Niche', 'duration_minutes': 25, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
+                ]
+            }
+        ]
+    },
+    {
+        'title': 'Trading & Finance',
+        'description': 'Master trading strategies, technical analysis, and risk management',
+        'category': 'Finance',
+        'difficulty': 'Intermediate',
+        'duration_weeks': 8,
+        'thumbnail_url': '/src/assets/thumbnails/trading.png',
+        'instructor': 'David Chen',
+        'average_rating': 4.8,
+        'enrolled_students': 3421,
+        'is_featured': True,
+        'stages': [
+            {
+                'title': 'Trading Fundamentals',
+                'description': 'Learn the basics of trading',
+                'duration_hours': 3,
+                'order_index': 1,
+                'videos': [
+                    {'title': 'Introduction to Trading', 'duration_minutes': 30, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
+                    {'title': 'Market Analysis', 'duration_minutes': 35, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
+                ]
+            }
+        ]
+    },
+    {
+        'title': 'Blockchain & Web3',
+        'description': 'Understand blockchain technology, smart contracts, and DeFi',
+        'category': 'Technology',
+        'difficulty': 'Advanced',
+        'duration_weeks': 10,
+        'thumbnail_url': '/src/assets/thumbnails/blockchain_web3.png',
+        'instructor': 'Alex Rodriguez',
+        'average_rating': 4.6,
+        'enrolled_students': 1876,
+        'is_featured': False,
+        'stages': [
+            {
+                'title': 'Blockchain Basics',
+                'description': 'Understanding blockchain technology',
+                'duration_hours': 4,
+                'order_index': 1,
+                'videos': [
+                    {'title': 'What is Blockchain?', 'duration_minutes': 25, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
+                    {'title': 'Cryptocurrency Fundamentals', 'duration_minutes': 30, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
+                ]
+            }
+        ]
+    },
+    {
+        'title': 'Digital Marketing',
+        'description': 'Learn SEO, social media marketing, and digital advertising strategies',
+        'category': 'Marketing',
+        'difficulty': 'Beginner',
+        'duration_weeks': 8,
+        'thumbnail_url': '/src/assets/thumbnails/marketing.png',
+        'instructor': 'Emma Thompson',
+        'average_rating': 4.8,
+        'enrolled_students': 4123,
+        'is_featured': True,
+        'stages': [
+            {
+                'title': 'Marketing Fundamentals',
+                'description': 'Learn the basics of digital marketing',
+                'duration_hours': 3,
+                'order_index': 1,
+                'videos': [
+                    {'title': 'Introduction to Digital Marketing', 'duration_minutes': 20, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
+                    {'title': 'Understanding Your Audience', 'duration_minutes': 25, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
+                ]
+            }
+        ]
+    },
+    {
+        'title': 'Online Writing',
+        'description': 'Master copywriting, content creation, and freelance writing skills',
+        'category': 'Writing',
+        'difficulty': 'Beginner',
+        'duration_weeks': 6,
+        'thumbnail_url': '/src/assets/thumbnails/online_writing.png',
+        'instructor': 'Lisa Garcia',
+        'average_rating': 4.7,
+        'enrolled_students': 2341,
+        'is_featured': False,
+        'stages': [
+            {
+                'title': 'Writing Fundamentals',
+                'description': 'Learn the basics of effective writing',
+                'duration_hours': 2,
+                'order_index': 1,
+                'videos': [
+                    {'title': 'Writing for the Web', 'duration_minutes': 22, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
+                    {'title': 'Finding Your Voice', 'duration_minutes': 18, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
+                ]
+            }
+        ]
+    },
+    {
+        'title': 'Transcription Services',
+        'description': 'Learn professional transcription techniques and tools',
+        'category': 'Services',
+        'difficulty': 'Beginner',
+        'duration_weeks': 4,
+        'thumbnail_url': '/src/assets/thumbnails/transcription.png',
+        'instructor': 'Mark Johnson',
+        'average_rating': 4.5,
+        'enrolled_students': 1654,
+        'is_featured': False,
+        'stages': [
+            {
+                'title': 'Transcription Basics',
+                'description': 'Learn the fundamentals of transcription',
+                'duration_hours': 2,
+                'order_index': 1,
+                'videos': [
+                    {'title': 'Introduction to Transcription', 'duration_minutes': 15, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
+                    {'title': 'Tools and Software', 'duration_minutes': 20, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
+                ]
+            }
+        ]
+    },
+    {
+        'title': 'Customer Service Excellence',
+        'description': 'Develop exceptional customer service and communication skills',
+        'category': 'Business',
+        'difficulty': 'Beginner',
+        'duration_weeks': 5,
+        'thumbnail_url': '/src/assets/thumbnails/customer_service.png',
+        'instructor': 'Jennifer Lee',
+        'average_rating': 4.6,
+        'enrolled_students': 2987,
+        'is_featured': False,
+        'stages': [
+            {
+                'title': 'Customer Service Fundamentals',
+                'description': 'Learn the basics of excellent customer service',
+                'duration_hours': 2,
+                'order_index': 1,
+                'videos': [
+                    {'title': 'Understanding Customer Needs', 'duration_minutes': 18, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
+                    {'title': 'Communication Skills', 'duration_minutes': 22, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2}
+                ]
+            }
+        ]
+    },
+    {
+        'title': 'AI & Machine Learning',
+        'description': 'Master artificial intelligence, machine learning, and data science',
+        'category': 'Technology',
+        'difficulty': 'Advanced',
+        'duration_weeks': 16,
+        'thumbnail_url': '/src/assets/thumbnails/ai.png',
+        'instructor': 'Dr. Sarah Chen',
+        'average_rating': 4.9,
+        'enrolled_students': 1923,
+        'is_featured': True,
+        'stages': [
+            {
+                'title': 'Introduction to AI',
+                'description': 'Understanding artificial intelligence fundamentals',
+                'duration_hours': 3,
+                'order_index': 1,
+                'videos': [
+                    {'title': 'What is Artificial Intelligence?', 'duration_minutes': 20, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 1},
+                    {'title': 'History of AI', 'duration_minutes': 25, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 2},
+                    {'title': 'AI Applications Today', 'duration_minutes': 30, 'youtube_id': 'dQw4w9WgXcQ', 'order_index': 3}
+                ]
+            }
+        ]
+    }
+]
+
+USERS = [
+    {
+        'username': 'admin',
+        'first_name': 'Admin',
+        'last_name': 'User',
+        'email': 'admin@mikelearning.com',
+        'is_admin': True,
+        'password': 'admin123'
+    },
+    {
+        'username': 'demouser',
+        'first_name': 'Demo',
+        'last_name': 'User',
+        'email': 'user@mikelearning.com',
+        'is_admin': False,
+        'password': 'user123'
+    }
+]
+
+def _insert_returning_ids(model, rows):
+    """Bulk insert ``rows``; returns the new primary keys in row order"""
+    if not rows:
+        return []
+    return db.session.scalars(
+        insert(model).returning(model.id, sort_by_parameter_order=True), rows
+    ).all()
+
+def seed_courses(courses=COURSES):
+    """Insert the demo catalog if there are no courses; returns courses added"""
+    if db.session.query(Course.id).first() is not None:
+        return 0
+
+    course_ids = _insert_returning_ids(Course, [
+        {key: value for key, value in course.items() if key != 'stages'} for course in courses
+    ])
+
+    stage_rows = []
+    stage_videos = []
+    for course_id, course in zip(course_ids, courses):
+        for stage in course.get('stages', []):
+            stage_rows.append(dict({key: value for key, value in stage.items() if key != 'videos'}, course_id=course_id))
+            stage_videos.append(stage.get('videos', []))
+    stage_ids = _insert_returning_ids(CourseStage, stage_rows)
+
+    _insert_returning_ids(StageVideo, [
+        dict(video, stage_id=stage_id)
+        for stage_id, videos in zip(stage_ids, stage_videos)
+        for video in videos
+    ])
+    # Bulk inserts skip the ORM flush hook; bump catalog versions explicitly
+    mark_catalog_changed(db.session, course_ids)
+    db.session.commit()
+    return len(course_ids)
+
+def seed_users(users=USERS):
+    """Insert the demo admin and user accounts if there are no users; returns users added"""
+    if db.session.query(User.id).first() is not None:
+        return 0
+
+    _insert_returning_ids(User, [
+        dict({key: value for key, value in user.items() if key != 'password'},
+             password_hash=password_hasher.hash(user['password']))
+        for user in users
+    ])
+    db.session.commit()
+    return len(users)
+
+def seed_database():
+    """Seed courses and users; returns (courses added, users added)"""
+    added = (seed_courses(), seed_users())
+    if any(added):
+        # Bulk inserts skip the ORM flush hook that maintains the rollups
+        rebuild_rollups()
+    return added
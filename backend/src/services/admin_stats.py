@@ -0,0 +1,48 @@
+"""Grouped aggregate queries behind the admin listings"""
+from sqlalchemy import case, func
+from src.models.user import db
+from src.models.course import Course
+from src.models.progress import UserCourseProgress
+from src.services.catalog import LISTING_COLUMNS, listing_rows_to_dicts, stage_count_column
+
+def enrollment_counts_by_user(user_ids):
+    """Map user id -> (enrollments_count, completed_courses) for ``user_ids``"""
+    if not user_ids:
+        return {}
+
+    rows = db.session.query(
+        UserCourseProgress.user_id,
+        func.count(UserCourseProgress.id),
+        func.sum(case((UserCourseProgress.is_completed == True, 1), else_=0))
+    ).filter(
+        UserCourseProgress.user_id.in_(user_ids)
+    ).group_by(UserCourseProgress.user_id).all()
+
+    return {user_id: (enrollments, completed or 0) for user_id, enrollments, completed in rows}
+
+def enrollment_stats_subquery():
+    """Enrollments and completions per course as a grouped subquery"""
+    return db.session.query(
+        UserCourseProgress.course_id.label('course_id'),
+        func.count(UserCourseProgress.id).label('enrollments'),
+        func.sum(case((UserCourseProgress.is_completed == True, 1), else_=0)).label('completions')
+    ).group_by(UserCourseProgress.course_id).subquery()
+
+def admin_course_stats():
+    """Every course with stage count, enrollments, completions and completion rate"""
+    enrollment_stats = enrollment_stats_subquery()
+
+    rows = db.session.query(
+        *LISTING_COLUMNS,
+        stage_count_column(),
+        func.coalesce(enrollment_stats.c.enrollments, 0).label('actual_enrollments'),
+        func.coalesce(enrollment_stats.c.completions, 0).label('completions')
+    ).outerjoin(
+        enrollment_stats, enrollment_stats.c.course_id == Course.id
+    ).order_by(Course.id).all()
+
+    courses = listing_rows_to_dicts(rows)
+    for data in courses:
+        enrollments = data['actual_enrollments']
+        data['completion_rate'] = (data['completions'] / enrollments * 100) if enrollments > 0 else 0
+    return courses
@@ -0,0 +1,169 @@
+"""Column-projected queries and keyset pagination for the public course catalog"""
+import base64
+import json
+from sqlalchemy import and_, func, literal, select
+from src.models.user import db
+from src.models.course import Course, CourseStage
+from src.services.serializers import COURSE_SCHEMA
+
+# Columns serialized by the catalog listing, in response order
+LISTING_COLUMNS = (
+    Course.id,
+    Course.title,
+    Course.description,
+    Course.thumbnail_url,
+    Course.category,
+    Course.difficulty,
+    Course.duration_weeks,
+    Course.instructor,
+    Course.average_rating,
+    Course.enrolled_students,
+    Course.is_featured,
+    Course.is_active,
+    Course.created_at,
+    Course.updated_at,
+)
+
+LISTING_FIELDS = {column.key: column for column in LISTING_COLUMNS}
+
+# Sort keys accepted by the listing; each is a list of (expression, descending)
+# pairs ending in a unique column so keyset comparisons are total. Plain
+# columns keep the order servable from an index ('featured' from
+# ix_course_active_featured), which an expression such as CASE would not be
+SORT_KEYS = {
+    'featured': ((Course.is_featured, True), (Course.id, False)),
+    'rating': ((func.coalesce(Course.average_rating, 0.0), True), (Course.id, False)),
+    'title': ((Course.title, False), (Course.id, False)),
+    'newest': ((Course.id, True),),
+}
+
+DEFAULT_SORT = 'featured'
+
+MAX_PAGE_SIZE = 100
+
+_SORT_LABEL = '_sort_{}'
+
+def stage_count_column():
+    """``total_stages`` of the outer query's course as a correlated count, one index lookup per row"""
+    return select(func.count()).where(
+        CourseStage.course_id == Course.id
+    ).correlate(Course).scalar_subquery().label('total_stages')
+
+def active_categories_query():
+    """Distinct categories of active courses"""
+    return db.session.query(Course.category).filter(Course.is_active == True).distinct()
+
+def parse_fields(fields):
+    """Turn a ``fields=`` value into (columns, include_stage_counts)
+
+    Raises ValueError for unknown field names. ``id`` is always returned.
+    """
+    if not fields:
+        return LISTING_COLUMNS, True
+
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in names if name not in LISTING_FIELDS and name != 'total_stages']
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    columns = [Course.id] + [LISTING_FIELDS[name] for name in names if name in LISTING_FIELDS and name != 'id']
+    return tuple(columns), 'total_stages' in names
+
+def listing_query(columns=LISTING_COLUMNS, include_stage_counts=True):
+    """Query over active courses selecting ``columns`` and optionally ``total_stages``"""
+    if not include_stage_counts:
+        return db.session.query(*columns).filter(Course.is_active == True)
+
+    return db.session.query(*columns, stage_count_column()).filter(Course.is_active == True)
+
+def encode_cursor(sort, values):
+    raw = json.dumps({'s': sort, 'v': list(values)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, sort):
+    """Decode an opaque cursor; raises ValueError if malformed or for another sort"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = data['v']
+        cursor_sort = data['s']
+    except (ValueError, TypeError, KeyError):
+        raise ValueError('Invalid cursor')
+
+    if cursor_sort != sort or not isinstance(values, list) or len(values) != len(SORT_KEYS[sort]):
+        raise ValueError('Invalid cursor')
+    return values
+
+def _after_cursor(keys, values):
+    """Keyset predicates for the rows strictly after ``values``, in ``keys`` order
+
+    Branch ``i`` holds the rows equal to the cursor on the first ``i`` keys
+    and beyond it on key ``i``; taken from the last key to the first, the
+    branches follow one another in sort order. Each one is a single index
+    range, where their OR would be read from the start of the first key's
+    range on every page.
+    """
+    # Bound as parameters of the key's type: SQLAlchemy only compares booleans with '='
+    bound = [literal(value, expression.type) for (expression, _), value in zip(keys, values)]
+    for i in reversed(range(len(keys))):
+        expression, descending = keys[i]
+        equal_prefix = [keys[j][0] == bound[j] for j in range(i)]
+        yield and_(*equal_prefix, expression < bound[i] if descending else expression > bound[i])
+
+def listing_page_queries(query, sort=None, cursor=None):
+    """Ordered queries whose results, concatenated, are the rows of a page and all after it
+
+    Without a cursor that is the query itself; with one, a query per sort
+    key (see ``_after_cursor``). Raises ValueError for an unknown sort or a
+    bad cursor.
+    """
+    sort = sort or DEFAULT_SORT
+    if sort not in SORT_KEYS:
+        raise ValueError(f'Unknown sort: {sort}')
+    keys = SORT_KEYS[sort]
+
+    query = query.add_columns(*[
+        expression.label(_SORT_LABEL.format(i)) for i, (expression, _) in enumerate(keys)
+    ]).order_by(*[
+        expression.desc() if descending else expression.asc() for expression, descending in keys
+    ])
+    if not cursor:
+        return [query]
+    return [query.filter(predicate) for predicate in _after_cursor(keys, decode_cursor(cursor, sort))]
+
+def paginate_listing(query, sort=None, limit=None, cursor=None):
+    """Apply ordering and keyset pagination to a listing query
+
+    Returns ``(rows, next_cursor)``. Without ``limit`` all remaining rows are
+    returned and ``next_cursor`` is None.
+    """
+    sort = sort or DEFAULT_SORT
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+    queries = listing_page_queries(query, sort, cursor)
+
+    if limit is None:
+        return [row for branch in queries for row in branch.all()], None
+
+    # One extra row tells whether another page exists without a COUNT; later
+    # branches are only read when the earlier ones run out
+    rows = []
+    for branch in queries:
+        rows += branch.limit(limit + 1 - len(rows)).all()
+        if len(rows) > limit:
+            break
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]._asdict()
+    next_cursor = encode_cursor(sort, [last[_SORT_LABEL.format(i)] for i in range(len(SORT_KEYS[sort]))])
+    return rows, next_cursor
+
+def listing_row_to_dict(row):
+    """Serialize a listing row the same way as ``Course.to_dict()``"""
+    return COURSE_SCHEMA.dump_row(row)
+
+def listing_rows_to_dicts(rows):
+    """Serialize a page of listing rows with one compiled extractor"""
+    return COURSE_SCHEMA.dump_rows(rows)
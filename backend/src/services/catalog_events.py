@@ -0,0 +1,92 @@
+"""Change notifications and version bumps for catalog content (courses, stages and videos)"""
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from src.models.course import Course, CourseStage, StageVideo
+from src.services.catalog_version import COUNTERS_SCOPE, bump_versions
+
+_listeners = []
+
+_PENDING_KEY = 'catalog_changed_course_ids'
+
+def on_catalog_change(callback):
+    """Register ``callback(course_ids)``; usable as a decorator"""
+    _listeners.append(callback)
+    return callback
+
+def notify_catalog_change(course_ids):
+    """Fire catalog listeners explicitly, e.g. after a bulk SQL update"""
+    course_ids = {course_id for course_id in course_ids if course_id is not None}
+    if not course_ids:
+        return
+    for callback in _listeners:
+        callback(course_ids)
+
+def mark_catalog_changed(session, course_ids):
+    """Bump versions for a Core update in ``session`` and queue a notification fired on commit"""
+    course_ids = {course_id for course_id in course_ids if course_id is not None}
+    if course_ids:
+        bump_versions(session.connection(), course_ids)
+        session.info.setdefault(_PENDING_KEY, set()).update(course_ids)
+
+def mark_counters_changed(session, course_ids):
+    """Bump the courses' versions and the counters version for a counter update in ``session``
+
+    Categories and facets do not show counters, so the catalog version and
+    the listeners are left alone.
+    """
+    course_ids = {course_id for course_id in course_ids if course_id is not None}
+    if course_ids:
+        bump_versions(session.connection(), course_ids, scope=COUNTERS_SCOPE)
+
+def has_pending_changes(session):
+    """Whether ``session`` has unflushed catalog objects or catalog changes awaiting commit"""
+    if session.info.get(_PENDING_KEY):
+        return True
+    return any(isinstance(obj, (Course, CourseStage, StageVideo))
+               for obj in list(session.new) + list(session.dirty) + list(session.deleted))
+
+def _history_values(obj, attr):
+    """Current and previous values of a foreign key attribute"""
+    history = inspect(obj).attrs[attr].history
+    return set(history.added or ()) | set(history.unchanged or ()) | set(history.deleted or ())
+
+def _changed_course_ids(session):
+    course_ids = set()
+    stage_ids = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Course):
+            course_ids.add(obj.id)
+        elif isinstance(obj, CourseStage):
+            course_ids |= _history_values(obj, 'course_id')
+        elif isinstance(obj, StageVideo):
+            stage_ids |= _history_values(obj, 'stage_id')
+
+    stage_ids.discard(None)
+    if stage_ids:
+        rows = session.connection().execute(
+            select(CourseStage.course_id).where(CourseStage.id.in_(stage_ids))
+        )
+        course_ids |= {row[0] for row in rows}
+
+    course_ids.discard(None)
+    return course_ids
+
+@event.listens_for(Session, 'after_flush')
+def _after_flush(session, flush_context):
+    course_ids = _changed_course_ids(session)
+    if course_ids:
+        bump_versions(session.connection(), course_ids)
+        session.info.setdefault(_PENDING_KEY, set()).update(course_ids)
+        notify_catalog_change(course_ids)
+
+@event.listens_for(Session, 'after_commit')
+def _after_commit(session):
+    # Notified again after the flush-time call, so a cache refilled from the old snapshot in between is dropped
+    course_ids = session.info.pop(_PENDING_KEY, None)
+    if course_ids:
+        notify_catalog_change(course_ids)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _after_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,59 @@
+"""Content versions behind the ETags of the catalog endpoints"""
+from flask import current_app, request
+from sqlalchemy import select
+from src.models.user import db
+from src.models.course import CatalogVersion
+from src.services.schema import dialect_insert
+
+CATALOG_SCOPE = 0
+
+# Bumped by counter-only updates (enrolled_students), which the listing shows
+COUNTERS_SCOPE = -1
+
+# Bump when the shape of a catalog response changes so clients drop bodies in the old format
+ETAG_FORMAT = 'v1'
+
+def bump_versions(conn, course_ids, scope=CATALOG_SCOPE):
+    """Increment each course's version and the ``scope`` version on ``conn``"""
+    table = CatalogVersion.__table__
+    stmt = dialect_insert(conn, CatalogVersion)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.course_id],
+        set_={'version': table.c.version + 1}
+    )
+    # Sorted so concurrent writers lock the rows in the same order
+    conn.execute(stmt, [
+        {'course_id': course_id, 'version': 1}
+        for course_id in sorted({scope, *course_ids})
+    ])
+
+def content_version(course_id=CATALOG_SCOPE):
+    """Current version of one course, or of the whole catalog by default"""
+    version = db.session.execute(
+        select(CatalogVersion.version).where(CatalogVersion.course_id == course_id)
+    ).scalar()
+    return version or 0
+
+def listing_version():
+    """Catalog and counter versions in one lookup, for responses showing both"""
+    versions = dict(db.session.execute(
+        select(CatalogVersion.course_id, CatalogVersion.version).where(
+            CatalogVersion.course_id.in_((CATALOG_SCOPE, COUNTERS_SCOPE))
+        )
+    ).all())
+    return f'{versions.get(CATALOG_SCOPE, 0)}.{versions.get(COUNTERS_SCOPE, 0)}'
+
+def version_etag(version, course_id=CATALOG_SCOPE):
+    return f'{ETAG_FORMAT}-{course_id}-{version}'
+
+def not_modified(etag):
+    """A 304 response when the request's If-None-Match matches ``etag``, else None"""
+    if not request.if_none_match.contains(etag):
+        return None
+    return with_etag(current_app.response_class(status=304), etag)
+
+def with_etag(response, etag):
+    """Tag ``response`` and make clients revalidate it on every use"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,266 @@
+"""Streaming NDJSON import (upsert on natural keys) and export of the course catalog"""
+import json
+import math
+from itertools import islice
+from sqlalchemy import insert, select, update
+from src.models.user import db
+from src.models.course import Course, CourseStage, StageVideo
+from src.services.catalog_events import mark_catalog_changed
+
+COURSE_FIELDS = ('title', 'description', 'thumbnail_url', 'category', 'difficulty', 'duration_weeks',
+                 'instructor', 'average_rating', 'enrolled_students', 'is_featured', 'is_active')
+STAGE_FIELDS = ('title', 'description', 'duration_hours', 'order_index', 'is_active')
+VIDEO_FIELDS = ('title', 'youtube_id', 'order_index', 'duration_minutes', 'description', 'is_active')
+
+# Fields an import never overwrites on an existing row
+_CREATE_ONLY = {'enrolled_students'}
+
+def _not_null(model, fields):
+    """Fields whose column is NOT NULL: a line may omit them but not set them to null"""
+    return tuple(field for field in fields if not model.__table__.c[field].nullable)
+
+def _required(model, fields):
+    """NOT NULL fields without a default, which a line creating a row must supply"""
+    columns = model.__table__.c
+    return tuple(
+        field for field in _not_null(model, fields)
+        if columns[field].default is None and columns[field].server_default is None
+    )
+
+_NOT_NULL = {
+    'course': _not_null(Course, COURSE_FIELDS),
+    'stage': _not_null(CourseStage, STAGE_FIELDS),
+    'video': _not_null(StageVideo, VIDEO_FIELDS)
+}
+
+def _field_types(model, fields):
+    """Python type each field's value must have, from its column type"""
+    return {field: model.__table__.c[field].type.python_type for field in fields}
+
+_FIELD_TYPES = {
+    'course': _field_types(Course, COURSE_FIELDS),
+    'stage': _field_types(CourseStage, STAGE_FIELDS),
+    'video': _field_types(StageVideo, VIDEO_FIELDS)
+}
+
+_TYPE_NAMES = {bool: 'a boolean', int: 'an integer', float: 'a number', str: 'a string'}
+
+def _type_ok(value, expected):
+    # bool is an int subclass, so it is only accepted for boolean columns
+    if isinstance(value, bool):
+        return expected is bool
+    if expected is float:
+        return isinstance(value, (int, float)) and math.isfinite(value)
+    return isinstance(value, expected)
+
+# Stage and video lines are checked for their required fields in _validate
+_COURSE_REQUIRED = _required(Course, COURSE_FIELDS)
+
+DEFAULT_BATCH_SIZE = 200
+
+def _pick(record, fields):
+    return {field: record[field] for field in fields if field in record}
+
+def _validate(record, line_number):
+    """Check one parsed course line; raises ValueError naming the line"""
+    def fail(message):
+        raise ValueError(f'Line {line_number}: {message}')
+
+    def check_fields(row, label):
+        nulls = [field for field in _NOT_NULL[label] if field in row and row[field] is None]
+        if nulls:
+            fail(f"{label} {', '.join(nulls)} cannot be null")
+        for field, expected in _FIELD_TYPES[label].items():
+            if row.get(field) is not None and not _type_ok(row[field], expected):
+                fail(f'{label} {field} must be {_TYPE_NAMES[expected]}')
+
+    if not isinstance(record, dict):
+        fail('expected a JSON object')
+    if not isinstance(record.get('title'), str) or not record['title'].strip():
+        fail('course title is required')
+    check_fields(record, 'course')
+    stages = record.get('stages', [])
+    if not isinstance(stages, list):
+        fail('stages must be a list')
+    for stage in stages:
+        if not isinstance(stage, dict) or not isinstance(stage.get('order_index'), int) or not stage.get('title'):
+            fail('each stage needs a title and an integer order_index')
+        check_fields(stage, 'stage')
+        videos = stage.get('videos', [])
+        if not isinstance(videos, list):
+            fail('videos must be a list')
+        for video in videos:
+            if not isinstance(video, dict) or not isinstance(video.get('order_index'), int) \
+                    or not video.get('title') or not video.get('youtube_id'):
+                fail('each video needs a title, a youtube_id and an integer order_index')
+            check_fields(video, 'video')
+
+def parse_lines(lines):
+    """Yield ``(line_number, record)`` for validated course records in NDJSON lines (str or bytes), skipping blanks"""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f'Line {line_number}: invalid JSON ({e})')
+        _validate(record, line_number)
+        yield line_number, record
+
+def _upsert(model, keyed_rows, existing, stats, label):
+    """Insert or update ``{natural_key: row}``; returns {natural_key: id}
+
+    ``existing`` maps natural keys already in the database to their current
+    rows (with ``id``). Rows whose imported values all match are not
+    rewritten, so re-importing an unchanged file writes nothing.
+    """
+    ids = {}
+    updates = []
+    new_keys = []
+    new_rows = []
+    for key, row in keyed_rows.items():
+        current = existing.get(key)
+        if current is None:
+            new_keys.append(key)
+            new_rows.append(row)
+            continue
+        ids[key] = current.id
+        values = {
+            field: value for field, value in row.items()
+            if field not in _CREATE_ONLY and getattr(current, field) != value
+        }
+        if values:
+            updates.append(dict(values, id=current.id))
+
+    if new_rows:
+        new_ids = db.session.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True), new_rows
+        ).all()
+        ids.update(zip(new_keys, new_ids))
+    if updates:
+        db.session.execute(update(model), updates)
+
+    stats[f'{label}_created'] += len(new_rows)
+    stats[f'{label}_updated'] += len(updates)
+    return ids
+
+def _columns(model, fields):
+    return [model.id] + [getattr(model, field) for field in fields]
+
+def _import_batch(numbered_records, stats):
+    # Courses, matched by title; a title repeated in the batch keeps its last line
+    lines = {record['title']: (line_number, record) for line_number, record in numbered_records}
+    records = [record for _, record in numbered_records]
+    courses = {title: _pick(record, COURSE_FIELDS) for title, (_, record) in lines.items()}
+    existing = {
+        row.title: row for row in db.session.execute(
+            select(*_columns(Course, COURSE_FIELDS)).where(Course.title.in_(list(courses)))
+        )
+    }
+    # Checked before anything in the batch is written, so the batch rolls back cleanly
+    for title, (line_number, record) in lines.items():
+        missing = [field for field in _COURSE_REQUIRED if title not in existing and field not in record]
+        if missing:
+            raise ValueError(f"Line {line_number}: new course {title!r} needs {', '.join(missing)}")
+    course_ids = _upsert(Course, courses, existing, stats, 'courses')
+
+    # Stages, matched by (course_id, order_index)
+    stages = {}
+    for record in records:
+        course_id = course_ids[record['title']]
+        for stage in record.get('stages', []):
+            stages[(course_id, stage['order_index'])] = dict(_pick(stage, STAGE_FIELDS), course_id=course_id)
+    existing = {
+        (row.course_id, row.order_index): row for row in db.session.execute(
+            select(CourseStage.course_id, *_columns(CourseStage, STAGE_FIELDS))
+            .where(CourseStage.course_id.in_(list(course_ids.values())))
+        )
+    }
+    stage_ids = _upsert(CourseStage, stages, existing, stats, 'stages')
+
+    # Videos, matched by (stage_id, order_index)
+    videos = {}
+    for record in records:
+        course_id = course_ids[record['title']]
+        for stage in record.get('stages', []):
+            stage_id = stage_ids[(course_id, stage['order_index'])]
+            for video in stage.get('videos', []):
+                videos[(stage_id, video['order_index'])] = dict(_pick(video, VIDEO_FIELDS), stage_id=stage_id)
+    existing = {
+        (row.stage_id, row.order_index): row for row in db.session.execute(
+            select(StageVideo.stage_id, *_columns(StageVideo, VIDEO_FIELDS))
+            .join(CourseStage, CourseStage.id == StageVideo.stage_id)
+            .where(CourseStage.course_id.in_(list(course_ids.values())))
+        )
+    }
+    _upsert(StageVideo, videos, existing, stats, 'videos')
+
+    # Bulk statements skip the ORM flush hook; refresh catalog caches on commit
+    mark_catalog_changed(db.session, course_ids.values())
+
+def import_courses(lines, batch_size=DEFAULT_BATCH_SIZE):
+    """Upsert courses from NDJSON ``lines``, committing each batch; returns counts
+
+    A line that fails validation, including a new course missing one of its
+    NOT NULL fields, raises ValueError naming the line; batches before it
+    stay committed, and re-running the fixed file completes the import.
+    """
+    stats = {
+        'courses_created': 0, 'courses_updated': 0,
+        'stages_created': 0, 'stages_updated': 0,
+        'videos_created': 0, 'videos_updated': 0
+    }
+    records = parse_lines(lines)
+    try:
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            _import_batch(batch, stats)
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return stats
+
+def _row_dict(row, fields):
+    return {field: getattr(row, field) for field in fields}
+
+def export_courses(batch_size=DEFAULT_BATCH_SIZE, include_inactive=True):
+    """Yield the catalog as NDJSON lines, one course with its stages and videos per line"""
+    last_id = 0
+    while True:
+        query = select(Course.id, *(getattr(Course, field) for field in COURSE_FIELDS)).where(
+            Course.id > last_id
+        ).order_by(Course.id).limit(batch_size)
+        if not include_inactive:
+            query = query.where(Course.is_active == True)
+        courses = db.session.execute(query).all()
+        if not courses:
+            return
+        last_id = courses[-1].id
+        course_ids = [course.id for course in courses]
+
+        stages_by_course = {}
+        stage_lists = {}
+        for stage in db.session.execute(
+            select(CourseStage.id, CourseStage.course_id, *(getattr(CourseStage, field) for field in STAGE_FIELDS))
+            .where(CourseStage.course_id.in_(course_ids))
+            .order_by(CourseStage.course_id, CourseStage.order_index)
+        ):
+            data = _row_dict(stage, STAGE_FIELDS)
+            data['videos'] = stage_lists[stage.id] = []
+            stages_by_course.setdefault(stage.course_id, []).append(data)
+
+        for video in db.session.execute(
+            select(StageVideo.stage_id, *(getattr(StageVideo, field) for field in VIDEO_FIELDS))
+            .join(CourseStage, CourseStage.id == StageVideo.stage_id)
+            .where(CourseStage.course_id.in_(course_ids))
+            .order_by(StageVideo.stage_id, StageVideo.order_index)
+        ):
+            stage_lists[video.stage_id].append(_row_dict(video, VIDEO_FIELDS))
+
+        for course in courses:
+            data = _row_dict(course, COURSE_FIELDS)
+            data['stages'] = stages_by_course.get(course.id, [])
+            yield json.dumps(data, ensure_ascii=False) + '\n'
@@ -0,0 +1,96 @@
+"""Course detail loading and serialized payload caching"""
+import threading
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from src.models.user import db
+from src.models.course import Course, CourseStage, StageVideo
+from src.services.catalog_events import on_catalog_change
+from src.services.serializers import COURSE_SCHEMA, STAGE_SCHEMA, VIDEO_SCHEMA
+
+_payload_cache = {}
+_cache_lock = threading.Lock()
+# Bumped on every invalidation so a payload built from an older snapshot is not stored
+_generation = 0
+
+def load_course_tree(course_id):
+    """Load an active course with stages and videos eagerly, ordered by order_index"""
+    return Course.query.options(
+        selectinload(Course.stages).selectinload(CourseStage.videos)
+    ).filter_by(id=course_id, is_active=True).first()
+
+def stages_query(course_id):
+    """Stage columns of one course in order"""
+    return select(*STAGE_SCHEMA.columns).where(CourseStage.course_id == course_id).order_by(CourseStage.order_index)
+
+def videos_query(course_id):
+    """Video columns of one course, grouped by stage and in order"""
+    # Stages in ix_course_stage_course_order order (the id makes it total), then
+    # each stage's videos from ix_stage_video_stage_order: both indexes
+    # deliver the order, so SQLite does not sort
+    return select(*VIDEO_SCHEMA.columns).join(
+        CourseStage, CourseStage.id == StageVideo.stage_id
+    ).where(CourseStage.course_id == course_id).order_by(
+        CourseStage.order_index, CourseStage.id, StageVideo.order_index
+    )
+
+def course_tree_dict(course_id):
+    """Serialized active course with ordered stages and videos, or None; no ORM objects are built"""
+    course = db.session.execute(
+        select(*COURSE_SCHEMA.columns).where(Course.id == course_id, Course.is_active == True)
+    ).first()
+    if course is None:
+        return None
+
+    stages = STAGE_SCHEMA.dump_rows(db.session.execute(stages_query(course_id)).all())
+    videos_by_stage = {stage['id']: [] for stage in stages}
+    for video in VIDEO_SCHEMA.dump_rows(db.session.execute(videos_query(course_id)).all()):
+        videos_by_stage[video['stage_id']].append(video)
+    for stage in stages:
+        stage['videos'] = videos_by_stage[stage['id']]
+
+    data = COURSE_SCHEMA.dump_row(course)
+    data['total_stages'] = len(stages)
+    data['stages'] = stages
+    return data
+
+def get_course_payload(course_id, version=None):
+    """Return the serialized course detail response body, or None if not found"""
+    cached = _payload_cache.get(course_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    generation = _generation
+    course = course_tree_dict(course_id)
+    if course is None:
+        return None
+
+    payload = current_app.json.dumps({
+        'course': course,
+        'enrolled': False,  # No authentication, so always false
+        'progress': {
+            'completion_percentage': 0,
+            'last_accessed': None,
+            'enrolled_at': None
+        }
+    })
+
+    with _cache_lock:
+        if generation == _generation:
+            _payload_cache[course_id] = (version, payload)
+    return payload
+
+@on_catalog_change
+def invalidate_courses(course_ids):
+    """Drop cached payloads for the given course ids"""
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        for course_id in course_ids:
+            _payload_cache.pop(course_id, None)
+
+def clear_cache():
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        _payload_cache.clear()
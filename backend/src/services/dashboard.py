@@ -0,0 +1,104 @@
+"""The per-user "my learning" dashboard, in one SQL statement"""
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import aliased
+from src.models.user import db
+from src.models.course import Course, CourseStage, StageVideo
+from src.models.progress import UserCourseProgress, UserVideoProgress
+from src.services.catalog import stage_count_column
+
+def _next_video_id(user_id):
+    """Correlated subquery: first active video of the course not completed by the user"""
+    completed = select(UserVideoProgress.id).where(
+        UserVideoProgress.user_id == user_id,
+        UserVideoProgress.video_id == StageVideo.id,
+        UserVideoProgress.is_completed == True
+    ).exists()
+
+    return select(StageVideo.id).join(
+        CourseStage, CourseStage.id == StageVideo.stage_id
+    ).where(
+        CourseStage.course_id == UserCourseProgress.course_id,
+        CourseStage.is_active == True,
+        StageVideo.is_active == True,
+        ~completed
+    ).order_by(
+        CourseStage.order_index, StageVideo.order_index
+    ).limit(1).correlate(UserCourseProgress).scalar_subquery()
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def user_dashboard(user_id):
+    """Enrolled active courses with progress, current stage and next video"""
+    next_video = aliased(StageVideo)
+    next_stage = aliased(CourseStage)
+    current_stage = aliased(CourseStage)
+
+    rows = db.session.query(
+        UserCourseProgress.course_id,
+        UserCourseProgress.progress_percentage,
+        UserCourseProgress.completed_stages,
+        UserCourseProgress.is_completed,
+        UserCourseProgress.enrollment_date,
+        UserCourseProgress.last_accessed,
+        Course.title,
+        Course.description,
+        Course.thumbnail_url,
+        stage_count_column(),
+        func.coalesce(current_stage.id, next_stage.id).label('current_stage_id'),
+        func.coalesce(current_stage.title, next_stage.title).label('current_stage_title'),
+        next_video.id.label('next_video_id'),
+        next_video.title.label('next_video_title'),
+        next_video.youtube_id.label('next_video_youtube_id'),
+        next_video.stage_id.label('next_video_stage_id')
+    ).join(
+        Course, Course.id == UserCourseProgress.course_id
+    ).outerjoin(
+        next_video, next_video.id == _next_video_id(user_id)
+    ).outerjoin(
+        next_stage, next_stage.id == next_video.stage_id
+    ).outerjoin(
+        current_stage, and_(
+            current_stage.id == UserCourseProgress.current_stage_id,
+            current_stage.is_active == True
+        )
+    ).filter(
+        UserCourseProgress.user_id == user_id,
+        Course.is_active == True
+    ).order_by(
+        UserCourseProgress.last_accessed.desc(), UserCourseProgress.id.desc()
+    ).all()
+
+    courses = []
+    for row in rows:
+        courses.append({
+            'id': row.course_id,
+            'title': row.title,
+            'description': row.description,
+            'thumbnail_url': row.thumbnail_url,
+            'progress': row.progress_percentage or 0.0,
+            'total_stages': row.total_stages,
+            'completed_stages': row.completed_stages or 0,
+            'is_completed': bool(row.is_completed),
+            'enrollment_date': _isoformat(row.enrollment_date),
+            'last_accessed': _isoformat(row.last_accessed),
+            'current_stage': {
+                'id': row.current_stage_id,
+                'title': row.current_stage_title
+            } if row.current_stage_id else None,
+            'next_video': {
+                'id': row.next_video_id,
+                'stage_id': row.next_video_stage_id,
+                'title': row.next_video_title,
+                'youtube_id': row.next_video_youtube_id,
+                'embed_url': f'https://www.youtube.com/embed/{row.next_video_youtube_id}'
+            } if row.next_video_id else None
+        })
+
+    return {
+        'enrolled_courses': courses,
+        'statistics': {
+            'total_courses': len(courses),
+            'completed_courses': sum(1 for course in courses if course['is_completed'])
+        }
+    }
@@ -0,0 +1,76 @@
+"""Course enrollment with atomic ``enrolled_students`` maintenance"""
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import select, update
+from src.models.user import User, db
+from src.models.course import Course
+from src.models.progress import UserCourseProgress
+from src.services.catalog_events import mark_counters_changed
+from src.services.response_cache import dashboard_cache, user_group
+from src.services.rollups import TOTAL_ENROLLMENTS, record_course_activity, record_totals
+from src.services.schema import dialect_insert
+
+# Upper bound on user ids accepted by one bulk enrollment request
+MAX_BULK_ENROLL = 10000
+
+def increment_enrolled_students(session, counts):
+    """Add {course_id: n} to ``Course.enrolled_students`` with atomic SQL increments"""
+    counts = {course_id: n for course_id, n in counts.items() if n}
+    if not counts:
+        return
+    for course_id, n in counts.items():
+        session.execute(
+            update(Course).where(Course.id == course_id).values(
+                enrolled_students=Course.enrolled_students + n,
+                # Keeps the column's onupdate from stamping a content edit
+                updated_at=Course.updated_at
+            )
+        )
+    # Only the course detail follows the live counter; listing and facet ETags keep their 304s
+    mark_counters_changed(session, counts)
+
+def enroll_users(course_id, user_ids):
+    """Enroll existing users in a course in one transaction and commit
+
+    Returns ``(enrolled, already_enrolled, unknown)``: the user ids that were
+    newly enrolled, those that already were, and ids matching no user.
+    """
+    session = db.session
+    requested = list(dict.fromkeys(user_ids))
+    known = set(session.scalars(select(User.id).where(User.id.in_(requested))))
+    unknown = [user_id for user_id in requested if user_id not in known]
+    candidates = [user_id for user_id in requested if user_id in known]
+    if not candidates:
+        return [], [], unknown
+
+    now = datetime.utcnow()
+    conn = session.connection()
+    table = UserCourseProgress.__table__
+    stmt = dialect_insert(conn, UserCourseProgress).on_conflict_do_nothing(
+        index_elements=[table.c.user_id, table.c.course_id]
+    ).returning(table.c.user_id)
+    enrolled = set(conn.execute(stmt, [
+        {
+            'user_id': user_id,
+            'course_id': course_id,
+            'enrollment_date': now,
+            'last_accessed': now,
+            'is_completed': False,
+            'progress_percentage': 0.0
+        } for user_id in candidates
+    ]).scalars())
+
+    if enrolled:
+        increment_enrolled_students(session, {course_id: len(enrolled)})
+        # Core inserts bypass the ORM flush hook, so feed the rollups directly
+        record_course_activity(conn, enrollments=Counter({(now.date(), course_id): len(enrolled)}))
+        record_totals(conn, {TOTAL_ENROLLMENTS: len(enrolled)})
+    session.commit()
+
+    if enrolled:
+        dashboard_cache.invalidate(*(user_group(user_id) for user_id in enrolled))
+    return (
+        [user_id for user_id in candidates if user_id in enrolled],
+        [user_id for user_id in candidates if user_id not in enrolled],
+        unknown
+    )
@@ -0,0 +1,81 @@
+"""Category, difficulty and featured counts for the catalog sidebar"""
+from collections import Counter
+from flask import current_app
+from sqlalchemy import func
+from src.models.user import db
+from src.models.course import Course
+from src.services.catalog_events import on_catalog_change
+from src.services.response_cache import facets_cache
+from src.services.search import search_filter
+
+FACETS_GROUP = 'catalog_facets'
+
+# Difficulty levels in teaching order; other values follow alphabetically
+DIFFICULTY_ORDER = ('Beginner', 'Intermediate', 'Advanced')
+
+def normalize_filters(category=None, difficulty=None, featured=None, search=None):
+    """Filters as the listing applies them: 'All' and blanks mean no filter, featured only when 'true'"""
+    return (
+        category if category and category != 'All' else None,
+        difficulty if difficulty and difficulty != 'All' else None,
+        True if featured and str(featured).lower() == 'true' else None,
+        search.strip() if search and search.strip() else None
+    )
+
+def facet_counts_query(search=None):
+    """Active course counts per (category, difficulty, is_featured)"""
+    query = db.session.query(
+        Course.category, Course.difficulty, Course.is_featured, func.count()
+    ).filter(Course.is_active == True)
+    if search:
+        query = query.filter(search_filter(search))
+    return query.group_by(Course.category, Course.difficulty, Course.is_featured)
+
+def _difficulty_key(value):
+    return (DIFFICULTY_ORDER.index(value), '') if value in DIFFICULTY_ORDER else (len(DIFFICULTY_ORDER), value or '')
+
+def compute_facets(category, difficulty, featured, search):
+    """Facet counts for normalized filters from one grouped query"""
+    groups = facet_counts_query(search).all()
+
+    categories = Counter()
+    difficulties = Counter()
+    featured_counts = Counter()
+    total = 0
+    for group_category, group_difficulty, group_featured, count in groups:
+        category_ok = category is None or group_category == category
+        difficulty_ok = difficulty is None or group_difficulty == difficulty
+        featured_ok = featured is None or bool(group_featured)
+        # Every value present keeps a row, with 0 when other filters exclude it
+        categories[group_category] += count if difficulty_ok and featured_ok else 0
+        difficulties[group_difficulty] += count if category_ok and featured_ok else 0
+        if category_ok and difficulty_ok:
+            featured_counts['all'] += count
+            featured_counts['featured'] += count if group_featured else 0
+            total += count if featured_ok else 0
+
+    return {
+        'filters': {'category': category, 'difficulty': difficulty, 'featured': featured, 'search': search},
+        'total': total,
+        'facets': {
+            'categories': [
+                {'value': value, 'count': categories[value]} for value in sorted(categories, key=lambda v: v or '')
+            ],
+            'difficulties': [
+                {'value': value, 'count': difficulties[value]} for value in sorted(difficulties, key=_difficulty_key)
+            ],
+            'featured': {'featured': featured_counts['featured'], 'all': featured_counts['all']}
+        }
+    }
+
+def catalog_facets(version, category=None, difficulty=None, featured=None, search=None):
+    """Serialized facets for the given filters at catalog ``version``, cached per combination"""
+    filters = normalize_filters(category, difficulty, featured, search)
+    key = repr((version,) + filters)
+    return facets_cache.get_or_compute(
+        FACETS_GROUP, key, lambda: current_app.json.dumps(compute_facets(*filters))
+    )
+
+@on_catalog_change
+def invalidate_facets(course_ids):
+    facets_cache.invalidate(FACETS_GROUP)
@@ -0,0 +1,65 @@
+"""Password hashing policy with rehash on login and a bounded verification pool"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+class PasswordHasherBusy(Exception):
+    """Raised when every verification slot is taken"""
+
+class PasswordHasher:
+    """Hashes with the configured method and verifies in a bounded pool"""
+
+    def __init__(self, method=DEFAULT_METHOD, threads=2, queue=16):
+        self.method = method
+        self.threads = threads
+        self.queue = queue
+        self._normalized_method = None
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(threads + queue)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', self.method)
+        self.threads = app.config.get('PASSWORD_HASH_THREADS', self.threads)
+        self.queue = app.config.get('PASSWORD_HASH_QUEUE', self.queue)
+        self._normalized_method = None
+        self._slots = threading.BoundedSemaphore(self.threads + self.queue)
+
+    def hash(self, password):
+        return generate_password_hash(password, method=self.method)
+
+    def method_of(self, password_hash):
+        """The method and parameters a stored hash was created with"""
+        return password_hash.split('$', 1)[0] if password_hash else ''
+
+    def policy_method(self):
+        """The policy method with Werkzeug's defaults filled in (e.g. 'scrypt' -> 'scrypt:32768:8:1')"""
+        if self._normalized_method is None:
+            self._normalized_method = self.method_of(self.hash(''))
+        return self._normalized_method
+
+    def needs_rehash(self, password_hash):
+        return self.method_of(password_hash) != self.policy_method()
+
+    def _pool(self):
+        # Created on first use so each forked worker gets its own threads
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='password-hash')
+        return self._executor
+
+    def verify(self, password_hash, password):
+        """Check ``password`` against ``password_hash`` in the pool; raises PasswordHasherBusy when saturated"""
+        if not password_hash:
+            return False
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Too many concurrent password checks')
+        try:
+            return self._pool().submit(check_password_hash, password_hash, password).result()
+        finally:
+            self._slots.release()
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,36 @@
+"""Cached authorization flags (``is_admin``, ``is_active``) per user"""
+import json
+from collections import namedtuple
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from src.models.user import User, db
+from src.services.response_cache import principal_cache
+
+Principal = namedtuple('Principal', ('id', 'is_admin', 'is_active'))
+
+def _principal_group(user_id):
+    return f'principal:{user_id}'
+
+def _load(user_id):
+    row = db.session.query(User.id, User.is_admin, User.is_active).filter(User.id == user_id).first()
+    # Unknown ids are cached too ('null'), so bogus tokens cannot force queries
+    return json.dumps([row.id, bool(row.is_admin), bool(row.is_active)] if row else None)
+
+def get_principal(user_id):
+    """The Principal for ``user_id``, or None if there is no such user"""
+    memo = g.setdefault('principals', {})
+    if user_id not in memo:
+        data = json.loads(principal_cache.get_or_compute(
+            _principal_group(user_id), 'principal', lambda: _load(user_id)
+        ))
+        memo[user_id] = Principal(*data) if data else None
+    return memo[user_id]
+
+def current_principal():
+    """The Principal of the JWT identity in the current request"""
+    return get_principal(int(get_jwt_identity()))
+
+def invalidate_principal(user_id):
+    """Drop a cached principal after its flags, password or row change"""
+    principal_cache.invalidate(_principal_group(user_id))
+    g.get('principals', {}).pop(user_id, None)
@@ -0,0 +1,226 @@
+"""Incremental video -> stage -> course progress, weighted by video duration"""
+import threading
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import case, func, update
+from src.models.user import db
+from src.models.course import CourseStage, StageVideo
+from src.models.progress import UserCourseProgress, UserStageProgress, UserVideoProgress
+from src.services.catalog_events import on_catalog_change
+from src.services.catalog_version import content_version
+from src.services.rollups import record_course_activity
+
+# Share of a video's duration that counts as watching it to the end
+COMPLETION_THRESHOLD = 0.9
+
+_totals_cache = {}
+_totals_lock = threading.Lock()
+
+def video_weight(duration_minutes):
+    return duration_minutes if duration_minutes and duration_minutes > 0 else 1
+
+# SQL counterpart of video_weight
+_WEIGHT = case((StageVideo.duration_minutes > 0, StageVideo.duration_minutes), else_=1)
+
+def course_totals(course_id):
+    """Active video counts and minutes per stage for a course, cached per content version
+
+    Returns ``{'stages': {stage_id: (videos, minutes)}, 'stage_count': n, 'minutes': m}``
+    where only stages with at least one active video are counted.
+    """
+    # Writes from other workers or the CLI bump the shared version, so
+    # entries built before them are not reused here
+    version = content_version(course_id)
+    cached = _totals_cache.get(course_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    rows = db.session.query(
+        StageVideo.stage_id, func.count(StageVideo.id), func.sum(_WEIGHT)
+    ).join(CourseStage, CourseStage.id == StageVideo.stage_id).filter(
+        CourseStage.course_id == course_id,
+        CourseStage.is_active == True,
+        StageVideo.is_active == True
+    ).group_by(StageVideo.stage_id).all()
+
+    stages = {stage_id: (videos, minutes) for stage_id, videos, minutes in rows}
+    totals = {
+        'stages': stages,
+        'stage_count': len(stages),
+        'minutes': sum(minutes for _, minutes in stages.values())
+    }
+    with _totals_lock:
+        _totals_cache[course_id] = (version, totals)
+    return totals
+
+@on_catalog_change
+def _invalidate_totals(course_ids):
+    with _totals_lock:
+        for course_id in course_ids:
+            _totals_cache.pop(course_id, None)
+
+def _percentage(done, total):
+    if not total:
+        return 0.0
+    return round(min(100.0, done * 100.0 / total), 2)
+
+def is_watched(position_seconds, duration_minutes):
+    """Whether playback reached the completion threshold for a video"""
+    if not duration_minutes:
+        return False
+    return position_seconds >= duration_minutes * 60 * COMPLETION_THRESHOLD
+
+def apply_video_completions(completions):
+    """Apply newly completed videos to stage and course progress
+
+    ``completions`` is a list of dicts with ``stage_progress_id``,
+    ``course_progress_id``, ``stage_id``, ``course_id``, ``duration_minutes``
+    and ``completed_at``, one per ``UserVideoProgress`` that just flipped to
+    completed. Runs in the current transaction.
+    """
+    course_completions = Counter()
+    totals_by_course = {}
+
+    for event in completions:
+        if event['course_id'] not in totals_by_course:
+            totals_by_course[event['course_id']] = course_totals(event['course_id'])
+        totals = totals_by_course[event['course_id']]
+        stage_videos, stage_minutes = totals['stages'].get(event['stage_id'], (0, 0))
+        weight = video_weight(event['duration_minutes'])
+        completed_at = event['completed_at']
+
+        stage = db.session.execute(
+            update(UserStageProgress).where(
+                UserStageProgress.id == event['stage_progress_id']
+            ).values(
+                completed_videos=UserStageProgress.completed_videos + 1,
+                completed_minutes=UserStageProgress.completed_minutes + weight
+            ).returning(
+                UserStageProgress.completed_videos,
+                UserStageProgress.completed_minutes,
+                UserStageProgress.is_completed
+            )
+        ).one()
+
+        stage_done = stage.completed_videos >= stage_videos > 0
+        stage_flipped = stage_done and not stage.is_completed
+        stage_values = {'progress_percentage': _percentage(stage.completed_minutes, stage_minutes)}
+        if stage_flipped:
+            stage_values.update(is_completed=True, completion_date=completed_at)
+        db.session.execute(
+            update(UserStageProgress).where(
+                UserStageProgress.id == event['stage_progress_id']
+            ).values(**stage_values)
+        )
+
+        course = db.session.execute(
+            update(UserCourseProgress).where(
+                UserCourseProgress.id == event['course_progress_id']
+            ).values(
+                completed_stages=UserCourseProgress.completed_stages + (1 if stage_flipped else 0),
+                completed_minutes=UserCourseProgress.completed_minutes + weight
+            ).returning(
+                UserCourseProgress.completed_stages,
+                UserCourseProgress.completed_minutes,
+                UserCourseProgress.is_completed
+            )
+        ).one()
+
+        course_done = course.completed_stages >= totals['stage_count'] > 0
+        course_values = {'progress_percentage': _percentage(course.completed_minutes, totals['minutes'])}
+        if course_done and not course.is_completed:
+            course_values.update(is_completed=True, completion_date=completed_at)
+            course_completions[(completed_at.date(), event['course_id'])] += 1
+        db.session.execute(
+            update(UserCourseProgress).where(
+                UserCourseProgress.id == event['course_progress_id']
+            ).values(**course_values)
+        )
+
+    if course_completions:
+        # Core updates bypass the ORM flush hook, so feed the rollups directly
+        record_course_activity(db.session.connection(), completions=course_completions)
+
+def reconcile_progress(apply=True):
+    """Recompute stage and course counters from video progress; report drift
+
+    Returns a dict with the number of rows checked and the ids whose stored
+    counters or percentages disagreed. With ``apply`` the drifted rows are
+    rewritten in the current session and committed.
+    """
+    # Completed videos and minutes per stage progress row, from the raw rows
+    stage_actuals = {
+        stage_progress_id: (videos, minutes or 0)
+        for stage_progress_id, videos, minutes in db.session.query(
+            UserVideoProgress.stage_progress_id,
+            func.count(UserVideoProgress.id),
+            func.sum(_WEIGHT)
+        ).join(StageVideo, StageVideo.id == UserVideoProgress.video_id).join(
+            CourseStage, CourseStage.id == StageVideo.stage_id
+        ).filter(
+            UserVideoProgress.is_completed == True,
+            StageVideo.is_active == True,
+            CourseStage.is_active == True
+        ).group_by(UserVideoProgress.stage_progress_id)
+    }
+    totals_by_course = {}
+
+    def totals_for(course_id):
+        if course_id not in totals_by_course:
+            totals_by_course[course_id] = course_totals(course_id)
+        return totals_by_course[course_id]
+
+    report = {'stages_checked': 0, 'stage_drift': [], 'courses_checked': 0, 'course_drift': []}
+    now = datetime.utcnow()
+    stage_done_by_course_progress = Counter()
+    minutes_by_course_progress = Counter()
+
+    stage_rows = db.session.query(UserStageProgress, CourseStage.course_id).join(
+        CourseStage, CourseStage.id == UserStageProgress.stage_id
+    ).all()
+    for stage_progress, course_id in stage_rows:
+        report['stages_checked'] += 1
+        totals = totals_for(course_id)
+        stage_videos, stage_minutes = totals['stages'].get(stage_progress.stage_id, (0, 0))
+        videos, minutes = stage_actuals.get(stage_progress.id, (0, 0))
+        done = videos >= stage_videos > 0
+        percentage = _percentage(minutes, stage_minutes)
+
+        if done:
+            stage_done_by_course_progress[stage_progress.course_progress_id] += 1
+        minutes_by_course_progress[stage_progress.course_progress_id] += minutes
+
+        if (stage_progress.completed_videos, stage_progress.completed_minutes, bool(stage_progress.is_completed)) != (videos, minutes, done) \
+                or abs((stage_progress.progress_percentage or 0.0) - percentage) > 0.01:
+            report['stage_drift'].append(stage_progress.id)
+            if apply:
+                stage_progress.completed_videos = videos
+                stage_progress.completed_minutes = minutes
+                stage_progress.progress_percentage = percentage
+                if done != bool(stage_progress.is_completed):
+                    stage_progress.is_completed = done
+                    stage_progress.completion_date = (stage_progress.completion_date or now) if done else None
+
+    for course_progress in UserCourseProgress.query.all():
+        report['courses_checked'] += 1
+        totals = totals_for(course_progress.course_id)
+        stages = stage_done_by_course_progress[course_progress.id]
+        minutes = minutes_by_course_progress[course_progress.id]
+        done = stages >= totals['stage_count'] > 0
+        percentage = _percentage(minutes, totals['minutes'])
+
+        if (course_progress.completed_stages, course_progress.completed_minutes, bool(course_progress.is_completed)) != (stages, minutes, done) \
+                or abs((course_progress.progress_percentage or 0.0) - percentage) > 0.01:
+            report['course_drift'].append(course_progress.id)
+            if apply:
+                course_progress.completed_stages = stages
+                course_progress.completed_minutes = minutes
+                course_progress.progress_percentage = percentage
+                if done != bool(course_progress.is_completed):
+                    # ORM update, so the analytics rollup hook sees the flip
+                    course_progress.is_completed = done
+                    course_progress.completion_date = (course_progress.completion_date or now) if done else None
+
+    if apply:
+        db.session.commit()
+    return report
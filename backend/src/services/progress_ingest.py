@@ -0,0 +1,344 @@
+"""Buffered ingestion of video watch heartbeats, flushed to the progress tables in bulk"""
+import atexit
+import threading
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import tuple_, update
+from src.models.user import db
+from src.models.course import CourseStage, StageVideo
+from src.models.progress import UserCourseProgress, UserStageProgress, UserVideoProgress
+from src.services.enrollment import increment_enrolled_students
+from src.services.progress_engine import apply_video_completions, is_watched
+from src.services.response_cache import dashboard_cache, user_group
+from src.services.schema import dialect_insert
+
+class PendingProgress:
+    """Coalesced heartbeats for one user and video: the latest position wins, watched seconds add up, completion sticks"""
+
+    __slots__ = ('position_seconds', 'watched_seconds', 'completed', 'first_watched', 'last_watched', 'failures')
+
+    def __init__(self):
+        self.position_seconds = 0
+        self.watched_seconds = 0
+        self.completed = False
+        self.first_watched = None
+        self.last_watched = None
+        # Failed flushes this entry was part of
+        self.failures = 0
+
+    def merge(self, other):
+        """Fold a requeued entry into this newer one"""
+        self.add(other.position_seconds, other.watched_seconds, other.completed, other.last_watched)
+        self.first_watched = min(self.first_watched, other.first_watched)
+        self.failures = max(self.failures, other.failures)
+
+    def add(self, position_seconds, watched_seconds, completed, seen_at):
+        if self.first_watched is None or seen_at < self.first_watched:
+            self.first_watched = seen_at
+        if self.last_watched is None or seen_at >= self.last_watched:
+            self.position_seconds = position_seconds
+            self.last_watched = seen_at
+        self.watched_seconds += watched_seconds
+        self.completed = self.completed or completed
+
+class HeartbeatBuffer:
+    """Per-process heartbeat buffer with a background flush thread
+
+    At most ``max_pending`` entries are held; entries from a failed flush are
+    retried one per transaction and dropped after ``max_attempts`` failures.
+    """
+
+    def __init__(self, flush_interval=2.0, max_pending=5000, max_attempts=3):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.app = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.refused_heartbeats = 0
+        self.dropped_rows = 0
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_interval = app.config.get('PROGRESS_FLUSH_INTERVAL', self.flush_interval)
+        self.max_pending = app.config.get('PROGRESS_FLUSH_MAX_PENDING', self.max_pending)
+        self.max_attempts = app.config.get('PROGRESS_FLUSH_MAX_ATTEMPTS', self.max_attempts)
+        atexit.register(self._flush_at_exit)
+
+    def add(self, user_id, heartbeats):
+        """Buffer validated heartbeats for ``user_id``; returns how many were accepted
+
+        Heartbeats for entries already buffered are always merged; one that
+        needs a new entry is refused while ``max_pending`` entries are buffered.
+        """
+        now = datetime.utcnow()
+        accepted = 0
+        with self._lock:
+            for heartbeat in heartbeats:
+                key = (user_id, heartbeat['video_id'])
+                pending = self._pending.get(key)
+                if pending is None:
+                    if len(self._pending) >= self.max_pending:
+                        continue
+                    pending = self._pending[key] = PendingProgress()
+                pending.add(
+                    heartbeat['position_seconds'],
+                    heartbeat.get('watched_seconds', 0),
+                    heartbeat.get('completed', False),
+                    heartbeat.get('seen_at') or now
+                )
+                accepted += 1
+            self.refused_heartbeats += len(heartbeats) - accepted
+            pending_count = len(self._pending)
+
+        if not self.flush_interval:
+            self.flush()
+        else:
+            self._ensure_thread()
+            if pending_count >= self.max_pending:
+                self._wakeup.set()
+        return accepted
+
+    def _drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def _ensure_thread(self):
+        # Started lazily so each gunicorn worker gets its own thread after fork
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='progress-flush', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            with self.app.app_context():
+                try:
+                    self.flush()
+                except Exception as e:
+                    self.app.logger.exception('Progress flush failed: %s', e)
+                finally:
+                    db.session.remove()
+
+    def _flush_at_exit(self):
+        if self._pending and self.app is not None:
+            with self.app.app_context():
+                self.flush()
+
+    def flush(self):
+        """Write all buffered heartbeats; returns rows written
+
+        Entries that have not failed yet are written in one transaction,
+        entries from a failed flush one per transaction. Failed entries are
+        requeued (see ``_requeue``) and the last error is raised after the
+        rest is written.
+        """
+        with self._flush_lock:
+            pending = self._drain()
+            if not pending:
+                return 0
+            fresh = {key: value for key, value in pending.items() if not value.failures}
+            batches = ([fresh] if fresh else []) + [
+                {key: value} for key, value in pending.items() if value.failures
+            ]
+
+            written = 0
+            failed = {}
+            error = None
+            for batch in batches:
+                try:
+                    written += write_progress(batch)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    failed.update(batch)
+                    error = e
+                    continue
+                dashboard_cache.invalidate(*{user_group(user_id) for user_id, _ in batch})
+
+            self.flushes += 1
+            self.flushed_rows += written
+            if failed:
+                self.failed_flushes += 1
+                self._requeue(failed)
+            if error is not None:
+                raise error
+            return written
+
+    def _requeue(self, failed):
+        """Put failed entries back for an isolated retry, dropping those out of attempts"""
+        with self._lock:
+            for key, value in failed.items():
+                value.failures += 1
+                if value.failures >= self.max_attempts:
+                    self.dropped_rows += 1
+                    if self.app is not None:
+                        self.app.logger.error('Dropping progress for user %s, video %s after %s failed writes',
+                                              key[0], key[1], value.failures)
+                    continue
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = value
+                else:
+                    current.merge(value)
+
+    def stats(self):
+        return {
+            'pending': len(self._pending),
+            'max_pending': self.max_pending,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes,
+            'flushed_rows': self.flushed_rows,
+            'refused_heartbeats': self.refused_heartbeats,
+            'dropped_rows': self.dropped_rows,
+            'flush_interval_seconds': self.flush_interval
+        }
+
+def _ensure_parent_progress(pairs_by_video, video_rows):
+    """Map (user_id, stage_id) -> (stage_progress_id, course_progress_id), creating missing rows"""
+    course_pairs = {(user_id, video_rows[video_id][1]) for user_id, video_id in pairs_by_video}
+    stage_pairs = {(user_id, video_rows[video_id][0]) for user_id, video_id in pairs_by_video}
+
+    course_progress = dict(
+        ((user_id, course_id), progress_id) for user_id, course_id, progress_id in db.session.query(
+            UserCourseProgress.user_id, UserCourseProgress.course_id, UserCourseProgress.id
+        ).filter(tuple_(UserCourseProgress.user_id, UserCourseProgress.course_id).in_(course_pairs))
+    )
+    missing_courses = [
+        UserCourseProgress(user_id=user_id, course_id=course_id)
+        for user_id, course_id in course_pairs - set(course_progress)
+    ]
+    if missing_courses:
+        # Watching a video implies enrollment in its course
+        db.session.add_all(missing_courses)
+        db.session.flush()
+        increment_enrolled_students(db.session, Counter(p.course_id for p in missing_courses))
+        course_progress.update({(p.user_id, p.course_id): p.id for p in missing_courses})
+
+    stage_progress = dict(
+        ((user_id, stage_id), progress_id) for user_id, stage_id, progress_id in db.session.query(
+            UserStageProgress.user_id, UserStageProgress.stage_id, UserStageProgress.id
+        ).filter(tuple_(UserStageProgress.user_id, UserStageProgress.stage_id).in_(stage_pairs))
+    )
+    stage_courses = {stage_id: course_id for stage_id, course_id in video_rows.values()}
+    missing_stages = [
+        UserStageProgress(
+            user_id=user_id,
+            stage_id=stage_id,
+            course_progress_id=course_progress[(user_id, stage_courses[stage_id])]
+        )
+        for user_id, stage_id in stage_pairs - set(stage_progress)
+    ]
+    if missing_stages:
+        db.session.add_all(missing_stages)
+        db.session.flush()
+        stage_progress.update({(p.user_id, p.stage_id): p.id for p in missing_stages})
+
+    return {
+        (user_id, stage_id): (progress_id, course_progress[(user_id, stage_courses[stage_id])])
+        for (user_id, stage_id), progress_id in stage_progress.items()
+    }
+
+def write_progress(pending):
+    """Apply coalesced heartbeats {(user_id, video_id): PendingProgress} in the current transaction"""
+    video_ids = {video_id for _, video_id in pending}
+    video_rows = {}
+    durations = {}
+    # Videos that count towards progress: active, in an active stage
+    counted = set()
+    for video_id, stage_id, course_id, duration_minutes, video_active, stage_active in db.session.query(
+        StageVideo.id, StageVideo.stage_id, CourseStage.course_id, StageVideo.duration_minutes,
+        StageVideo.is_active, CourseStage.is_active
+    ).join(CourseStage, CourseStage.id == StageVideo.stage_id).filter(StageVideo.id.in_(video_ids)):
+        video_rows[video_id] = (stage_id, course_id)
+        durations[video_id] = duration_minutes
+        if video_active and stage_active:
+            counted.add(video_id)
+
+    # Heartbeats for unknown videos are dropped
+    pending = {key: value for key, value in pending.items() if key[1] in video_rows}
+    if not pending:
+        return 0
+
+    parents = _ensure_parent_progress(pending, video_rows)
+
+    # Videos already completed before this flush, to detect completion flips
+    already_completed = set(db.session.query(
+        UserVideoProgress.user_id, UserVideoProgress.video_id
+    ).filter(
+        tuple_(UserVideoProgress.user_id, UserVideoProgress.video_id).in_(list(pending)),
+        UserVideoProgress.is_completed == True
+    ))
+
+    rows = []
+    completions = []
+    stage_access = {}
+    course_access = {}
+    for (user_id, video_id), progress in pending.items():
+        stage_id, course_id = video_rows[video_id]
+        stage_progress_id, course_progress_id = parents[(user_id, stage_id)]
+        completed = progress.completed or is_watched(progress.position_seconds, durations[video_id])
+        # Stage and course totals leave inactive videos out, so their completions must not count either
+        if completed and video_id in counted and (user_id, video_id) not in already_completed:
+            completions.append({
+                'stage_progress_id': stage_progress_id,
+                'course_progress_id': course_progress_id,
+                'stage_id': stage_id,
+                'course_id': course_id,
+                'duration_minutes': durations[video_id],
+                'completed_at': progress.last_watched
+            })
+        rows.append({
+            'user_id': user_id,
+            'video_id': video_id,
+            'stage_progress_id': stage_progress_id,
+            'watch_time_seconds': progress.watched_seconds,
+            'last_position_seconds': progress.position_seconds,
+            'is_completed': completed,
+            'completion_date': progress.last_watched if completed else None,
+            'first_watched': progress.first_watched,
+            'last_watched': progress.last_watched
+        })
+        stage_access[stage_progress_id] = max(progress.last_watched, stage_access.get(stage_progress_id, progress.last_watched))
+        if course_progress_id not in course_access or progress.last_watched >= course_access[course_progress_id][0]:
+            course_access[course_progress_id] = (progress.last_watched, stage_id)
+
+    conn = db.session.connection()
+    table = UserVideoProgress.__table__
+    stmt = dialect_insert(conn, UserVideoProgress)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.video_id],
+        set_={
+            'watch_time_seconds': table.c.watch_time_seconds + stmt.excluded.watch_time_seconds,
+            'last_position_seconds': stmt.excluded.last_position_seconds,
+            'is_completed': table.c.is_completed | stmt.excluded.is_completed,
+            'completion_date': db.func.coalesce(table.c.completion_date, stmt.excluded.completion_date),
+            'last_watched': stmt.excluded.last_watched
+        }
+    )
+    conn.execute(stmt, rows)
+
+    db.session.execute(update(UserStageProgress), [
+        {'id': progress_id, 'last_accessed': accessed} for progress_id, accessed in stage_access.items()
+    ])
+    # The stage of the most recently watched video becomes the current stage
+    db.session.execute(update(UserCourseProgress), [
+        {'id': progress_id, 'last_accessed': accessed, 'current_stage_id': stage_id}
+        for progress_id, (accessed, stage_id) in course_access.items()
+    ])
+
+    if completions:
+        apply_video_completions(completions)
+    return len(rows)
+
+heartbeat_buffer = HeartbeatBuffer()
@@ -0,0 +1,88 @@
+"""``EXPLAIN QUERY PLAN`` checks for the hot query shapes (``flask check-query-plans``)"""
+from datetime import date, timedelta
+from sqlalchemy import select
+from src.models.user import User, db
+from src.models.course import Course
+from src.models.progress import UserCourseProgress
+from src.models.analytics import DailyCourseActivity
+from src.services.admin_stats import enrollment_stats_subquery
+from src.services.catalog import active_categories_query, encode_cursor, listing_page_queries, listing_query
+from src.services.course_tree import stages_query, videos_query
+from src.services.facets import facet_counts_query
+from src.services.user_search import user_search_filter
+
+def _statement(query):
+    return getattr(query, 'statement', query)
+
+def _listing_page(cursor=None, branch=0):
+    """The default-order catalog page as ``paginate_listing`` runs it"""
+    return listing_page_queries(listing_query(), cursor=cursor)[branch].limit(21)
+
+# A cursor in the middle of the featured courses: its page reads both branches
+_FEATURED_CURSOR = encode_cursor('featured', [True, 1])
+
+# name -> builder of the statement to explain
+HOT_QUERIES = {
+    'catalog first page': _listing_page,
+    'catalog next page, same featured flag': lambda: _listing_page(_FEATURED_CURSOR, 0),
+    'catalog next page, past featured': lambda: _listing_page(_FEATURED_CURSOR, 1),
+    'catalog by category': lambda: listing_query().filter(Course.category == 'Development'),
+    'catalog by category and difficulty': lambda: listing_query().filter(
+        Course.category == 'Development', Course.difficulty == 'Beginner', Course.is_featured == True
+    ),
+    'catalog categories': active_categories_query,
+    'catalog facet counts': facet_counts_query,
+    'course detail stages': lambda: stages_query(1),
+    'course detail videos': lambda: videos_query(1),
+    'admin course enrollment stats': lambda: select(enrollment_stats_subquery()),
+    'admin user prefix search': lambda: select(User.id).where(user_search_filter('ali', 'prefix')),
+    'user enrollments': lambda: select(UserCourseProgress.id).where(UserCourseProgress.user_id == 1),
+    'analytics recent activity': lambda: select(DailyCourseActivity.course_id).where(
+        DailyCourseActivity.day >= date.today() - timedelta(days=30)
+    ),
+}
+
+# name -> indexes the query reads in full by design: the first page walks
+# the featured order and stops at its LIMIT; the sidebar and admin
+# aggregates count every active course or enrollment once, in index order
+EXPECTED_SCANS = {
+    'catalog first page': ('ix_course_active_featured',),
+    'catalog categories': ('ix_course_active_filters',),
+    'catalog facet counts': ('ix_course_active_filters',),
+    'admin course enrollment stats': ('ix_user_course_progress_course',),
+}
+
+def explain(statement):
+    """EXPLAIN QUERY PLAN detail lines for ``statement`` with its parameters bound"""
+    conn = db.session.connection()
+    compiled = _statement(statement).compile(dialect=conn.dialect, compile_kwargs={'render_postcompile': True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    return [row[3] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params)]
+
+def plan_problems(plan, expected_scans=()):
+    """Descriptions of the full scans, materializations and sorts in ``plan``"""
+    tables = set(db.metadata.tables)
+    problems = []
+    for detail in plan:
+        words = detail.split()
+        if words[:2] == ['SCAN', 'TABLE']:
+            # SQLite before 3.36 words it 'SCAN TABLE course'
+            words = words[:1] + words[2:]
+        if len(words) >= 2 and words[0] == 'SCAN' and words[1] in tables:
+            if 'INDEX' not in words:
+                problems.append(f'full table scan of {words[1]}')
+            elif words[words.index('INDEX') + 1] not in expected_scans:
+                problems.append(f"full index scan of {words[1]} ({words[words.index('INDEX') + 1]})")
+        elif words[:1] == ['MATERIALIZE']:
+            problems.append(f'materialized subquery {words[1]}')
+        elif words[:3] == ['USE', 'TEMP', 'B-TREE']:
+            problems.append(f"temp b-tree {' '.join(words[3:])}")
+    return problems
+
+def check_query_plans():
+    """[(name, plan, problems)] for every hot query"""
+    results = []
+    for name, build in HOT_QUERIES.items():
+        plan = explain(build())
+        results.append((name, plan, plan_problems(plan, EXPECTED_SCANS.get(name, ()))))
+    return results
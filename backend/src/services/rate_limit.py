@@ -0,0 +1,198 @@
+"""Sliding-window rate limits for the login and registration endpoints"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from flask import request
+
+DEFAULT_RULES = {
+    'login_ip': '20/60',
+    'login_email': '5/300',
+    'register_ip': '10/3600'
+}
+
+def parse_rule(value):
+    """'<limit>/<seconds>' -> (limit, seconds)"""
+    limit, _, period = str(value).partition('/')
+    limit, period = int(limit), int(period or 60)
+    if limit < 1 or period < 1:
+        raise ValueError(f'Invalid rate limit rule: {value}')
+    return limit, period
+
+def _estimate(previous, current, elapsed_fraction):
+    return previous * (1.0 - elapsed_fraction) + current
+
+def _retry_after(previous, current, elapsed_fraction, limit, period):
+    """Seconds until the sliding estimate drops below ``limit``"""
+    if current < limit:
+        # Only the previous window's decaying share is in the way
+        wait = (_estimate(previous, current, elapsed_fraction) - limit) / previous * period
+    else:
+        # This window becomes the previous one and must decay below the limit too
+        wait = (1.0 - elapsed_fraction) * period + (1.0 - limit / current) * period
+    return max(1, math.ceil(wait + 1e-9))
+
+class MemoryStore:
+    """Window counters in this process only"""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def hit(self, key, window, elapsed_fraction, limit, consume):
+        """(previous, current) window counts before this event; counts it if ``consume`` and allowed"""
+        with self._lock:
+            previous = self._counts.get((key, window - 1), 0)
+            current = self._counts.get((key, window), 0)
+            if consume and _estimate(previous, current, elapsed_fraction) < limit:
+                self._counts[(key, window)] = current + 1
+            self._calls += 1
+            if self._calls % 1000 == 0:
+                # Windows before the previous one no longer matter
+                for stale in [k for k in self._counts if k[1] < window - 1]:
+                    del self._counts[stale]
+            return previous, current
+
+    def reset(self, key):
+        with self._lock:
+            for stale in [k for k in self._counts if k[0] == key]:
+                del self._counts[stale]
+
+class SQLiteStore:
+    """Window counters in a local SQLite file shared by every worker process"""
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit ("
+            "key TEXT NOT NULL, window INTEGER NOT NULL, count INTEGER NOT NULL, "
+            "PRIMARY KEY (key, window)) WITHOUT ROWID"
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.calls = 0
+        return conn
+
+    def hit(self, key, window, elapsed_fraction, limit, consume):
+        conn = self._connection()
+        # IMMEDIATE takes the write lock up front so check-and-increment is atomic across workers
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            counts = dict(conn.execute(
+                "SELECT window, count FROM rate_limit WHERE key = ? AND window IN (?, ?)",
+                (key, window - 1, window)
+            ).fetchall())
+            previous, current = counts.get(window - 1, 0), counts.get(window, 0)
+            if consume and _estimate(previous, current, elapsed_fraction) < limit:
+                conn.execute(
+                    "INSERT INTO rate_limit (key, window, count) VALUES (?, ?, 1) "
+                    "ON CONFLICT (key, window) DO UPDATE SET count = count + 1",
+                    (key, window)
+                )
+            self._local.calls += 1
+            if self._local.calls % 1000 == 0:
+                conn.execute("DELETE FROM rate_limit WHERE window < ?", (window - 1,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return previous, current
+
+    def reset(self, key):
+        self._connection().execute("DELETE FROM rate_limit WHERE key = ?", (key,))
+
+class RateLimiter:
+    """Named sliding-window rules over a counter store; configured with ``init_app``"""
+
+    def __init__(self):
+        self.store = MemoryStore()
+        self.rules = {name: parse_rule(value) for name, value in DEFAULT_RULES.items()}
+        self.enabled = True
+        self.proxy_count = 0
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+
+    def init_app(self, app):
+        config = app.config
+        self.enabled = config.get('RATE_LIMIT_ENABLED', True)
+        self.proxy_count = config.get('RATE_LIMIT_PROXY_COUNT', 0)
+        self.rules = {
+            name: parse_rule(config.get(f'RATE_LIMIT_{name.upper()}', default))
+            for name, default in DEFAULT_RULES.items()
+        }
+        backend = config.get('RATE_LIMIT_BACKEND', 'memory')
+        if backend == 'sqlite':
+            path = config.get('RATE_LIMIT_PATH') or os.path.join(
+                os.path.dirname(os.path.dirname(__file__)), 'database', 'rate_limit.db'
+            )
+            self.store = SQLiteStore(path)
+        elif backend == 'memory':
+            self.store = MemoryStore()
+        else:
+            raise ValueError(f'Unknown RATE_LIMIT_BACKEND: {backend}')
+
+    def _check(self, rule, key, consume):
+        """Seconds to wait if ``key`` is over the ``rule`` limit, else None"""
+        if not self.enabled:
+            return None
+        limit, period = self.rules[rule]
+        now = time.time()
+        window = int(now // period)
+        elapsed_fraction = (now - window * period) / period
+        previous, current = self.store.hit(f'{rule}:{key}', window, elapsed_fraction, limit, consume)
+
+        allowed = _estimate(previous, current, elapsed_fraction) < limit
+        # Stats count hits, plus peeks that turn a request away: an allowed peek
+        # may be followed by a hit for the same request, a rejected one never is
+        if consume or not allowed:
+            with self._stats_lock:
+                counters = self._stats.setdefault(rule, {'allowed': 0, 'rejected': 0})
+                counters['allowed' if allowed else 'rejected'] += 1
+        if allowed:
+            return None
+        return _retry_after(previous, current, elapsed_fraction, limit, period)
+
+    def hit(self, rule, key):
+        """Count an event for ``key``; returns seconds to wait if over the limit, else None"""
+        return self._check(rule, key, consume=True)
+
+    def peek(self, rule, key):
+        """Like ``hit`` but without counting an event; only a rejection shows in ``stats``"""
+        return self._check(rule, key, consume=False)
+
+    def reset(self, rule, key):
+        self.store.reset(f'{rule}:{key}')
+
+    def client_ip(self):
+        """Client address, taken from X-Forwarded-For behind ``RATE_LIMIT_PROXY_COUNT`` trusted proxies"""
+        if self.proxy_count and len(request.access_route) >= self.proxy_count:
+            return request.access_route[-self.proxy_count]
+        return request.remote_addr or 'unknown'
+
+    def stats(self):
+        """Allowed/rejected counts per rule in this worker (hits, and rejecting peeks), plus the configuration"""
+        with self._stats_lock:
+            counters = {rule: dict(values) for rule, values in self._stats.items()}
+        return {
+            'backend': self.store.name,
+            'enabled': self.enabled,
+            'rules': {
+                name: dict({'limit': limit, 'period_seconds': period}, **counters.get(name, {'allowed': 0, 'rejected': 0}))
+                for name, (limit, period) in self.rules.items()
+            }
+        }
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,200 @@
+"""TTL response cache with explicit invalidation, in memory or in a shared SQLite file"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+class MemoryBackend:
+    """Thread-safe LRU with per-entry expiry"""
+
+    name = 'memory'
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        # group -> keys, so invalidating one group does not walk every entry
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, group, key):
+        del self._entries[(group, key)]
+        keys = self._groups.get(group)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._groups[group]
+
+    def get(self, group, key):
+        with self._lock:
+            entry = self._entries.get((group, key))
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(group, key)
+                return None
+            self._entries.move_to_end((group, key))
+            return value
+
+    def set(self, group, key, value, ttl):
+        with self._lock:
+            self._entries[(group, key)] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end((group, key))
+            self._groups.setdefault(group, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                oldest_group, oldest_key = next(iter(self._entries))
+                self._remove(oldest_group, oldest_key)
+
+    def invalidate(self, group):
+        with self._lock:
+            for key in list(self._groups.get(group, ())):
+                self._remove(group, key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+
+    def size(self):
+        return len(self._entries)
+
+class SQLiteBackend:
+    """Cache table in a local SQLite file shared by every worker process"""
+
+    name = 'sqlite'
+
+    def __init__(self, path, maxsize=1024):
+        self.path = path
+        self.maxsize = maxsize
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "grp TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+                "expires_at REAL NOT NULL, PRIMARY KEY (grp, key))"
+            )
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, group, key):
+        row = self._connection().execute(
+            "SELECT value FROM response_cache WHERE grp = ? AND key = ? AND expires_at > ?",
+            (group, key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, group, key, value, ttl):
+        conn = self._connection()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO response_cache (grp, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (group, key, value, now + ttl)
+        )
+        # Keep the table bounded: drop expired rows, then the soonest to expire
+        conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM response_cache WHERE rowid IN ("
+            "SELECT rowid FROM response_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,)
+        )
+
+    def invalidate(self, group):
+        self._connection().execute("DELETE FROM response_cache WHERE grp = ?", (group,))
+
+    def clear(self):
+        self._connection().execute("DELETE FROM response_cache")
+
+    def size(self):
+        return self._connection().execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+class ResponseCache:
+    """Cache front end with hit/miss counters; configured with ``init_app``"""
+
+    def __init__(self, backend=None, ttl=60):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self.enabled = True
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def init_app(self, app, prefix='RESPONSE_CACHE'):
+        """Configure from ``<prefix>_BACKEND``, ``_TTL``, ``_SIZE`` and ``_PATH``"""
+        config = app.config
+        self.ttl = config.get(f'{prefix}_TTL', self.ttl)
+        self.enabled = self.ttl > 0
+        size = config.get(f'{prefix}_SIZE', 256)
+        backend = config.get(f'{prefix}_BACKEND', 'memory')
+        if backend == 'sqlite':
+            path = config.get(f'{prefix}_PATH') or os.path.join(
+                os.path.dirname(os.path.dirname(__file__)), 'database', f'{prefix.lower()}.db'
+            )
+            self.backend = SQLiteBackend(path, maxsize=size)
+        elif backend == 'memory':
+            self.backend = MemoryBackend(maxsize=size)
+        else:
+            raise ValueError(f'Unknown {prefix}_BACKEND: {backend}')
+
+    def get_or_compute(self, group, key, compute):
+        """Return the cached value for (group, key), computing and storing it on a miss"""
+        if not self.enabled:
+            return compute()
+
+        value = self.backend.get(group, key)
+        if value is not None:
+            with self._stats_lock:
+                self.hits += 1
+            return value
+
+        with self._stats_lock:
+            self.misses += 1
+        value = compute()
+        self.backend.set(group, key, value, self.ttl)
+        return value
+
+    def invalidate(self, *groups):
+        for group in groups:
+            self.backend.invalidate(group)
+        with self._stats_lock:
+            self.invalidations += len(groups)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        """Counters for this worker process plus the backend entry count"""
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend.name,
+            'enabled': self.enabled,
+            'ttl_seconds': self.ttl,
+            'entries': self.backend.size(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+# Cache for the admin dashboard endpoints
+admin_cache = ResponseCache()
+
+# Per-user "my learning" dashboards, one group per user (see user_group)
+dashboard_cache = ResponseCache(ttl=30)
+
+def user_group(user_id):
+    return f'user:{user_id}'
+
+# Authorization principals (admin/active flags) by user id, see src.services.principals
+principal_cache = ResponseCache(ttl=60)
+
+# Catalog facet counts per filter combination, see src.services.facets
+facets_cache = ResponseCache(ttl=300)
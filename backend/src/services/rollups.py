@@ -0,0 +1,235 @@
+"""Analytics rollup tables, maintained in the same transaction as the writes they count"""
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import case, event, func, inspect
+from sqlalchemy.orm import Session
+from src.models.user import User, db
+from src.models.course import Course
+from src.models.progress import UserCourseProgress
+from src.models.analytics import AnalyticsTotal, DailyCourseActivity, DailyRegistrations
+from src.services.schema import dialect_insert
+
+TOTAL_USERS = 'users'
+ACTIVE_USERS = 'active_users'
+TOTAL_ENROLLMENTS = 'enrollments'
+
+def _day(value):
+    return (value or datetime.utcnow()).date()
+
+def _as_date(value):
+    """SQLite's date() returns text, other backends return a date"""
+    if isinstance(value, str):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    return value
+
+def _upsert_increments(conn, model, keys, counters, rows):
+    """Add counter values to existing rows, inserting missing ones"""
+    if not rows:
+        return
+    table = model.__table__
+    stmt = dialect_insert(conn, model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c[key] for key in keys],
+        set_={counter: table.c[counter] + stmt.excluded[counter] for counter in counters}
+    )
+    conn.execute(stmt, rows)
+
+def record_registrations(conn, registrations):
+    """Apply a {day: count} delta to the daily registrations rollup"""
+    _upsert_increments(conn, DailyRegistrations, ('day',), ('registrations',), [
+        {'day': day, 'registrations': count} for day, count in registrations.items() if count
+    ])
+
+def record_course_activity(conn, enrollments=None, completions=None):
+    """Apply {(day, course_id): count} deltas to the daily course activity rollup"""
+    enrollments = enrollments or {}
+    completions = completions or {}
+    keys = set(enrollments) | set(completions)
+    _upsert_increments(conn, DailyCourseActivity, ('day', 'course_id'), ('enrollments', 'completions'), [
+        {
+            'day': day,
+            'course_id': course_id,
+            'enrollments': enrollments.get((day, course_id), 0),
+            'completions': completions.get((day, course_id), 0)
+        } for day, course_id in keys
+        if enrollments.get((day, course_id)) or completions.get((day, course_id))
+    ])
+
+def record_totals(conn, totals):
+    """Apply a {name: delta} change to the running totals"""
+    _upsert_increments(conn, AnalyticsTotal, ('name',), ('value',), [
+        {'name': name, 'value': delta} for name, delta in totals.items() if delta
+    ])
+
+def _flag_changed(obj, attr):
+    """(old, new) for a boolean attribute, or None if it did not change"""
+    history = inspect(obj).attrs[attr].history
+    if not history.has_changes():
+        return None
+    old = history.deleted[0] if history.deleted else None
+    new = history.added[0] if history.added else None
+    return bool(old), bool(new)
+
+@event.listens_for(Session, 'after_flush')
+def _collect_rollup_deltas(session, flush_context):
+    registrations = Counter()
+    enrollments = Counter()
+    completions = Counter()
+    totals = Counter()
+
+    for obj in session.new:
+        if isinstance(obj, User):
+            registrations[_day(obj.created_at)] += 1
+            totals[TOTAL_USERS] += 1
+            if obj.is_active is not False:
+                totals[ACTIVE_USERS] += 1
+        elif isinstance(obj, UserCourseProgress):
+            enrollments[(_day(obj.enrollment_date), obj.course_id)] += 1
+            totals[TOTAL_ENROLLMENTS] += 1
+            if obj.is_completed:
+                completions[(_day(obj.completion_date), obj.course_id)] += 1
+
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            change = _flag_changed(obj, 'is_active')
+            if change and change[0] != change[1]:
+                totals[ACTIVE_USERS] += 1 if change[1] else -1
+        elif isinstance(obj, UserCourseProgress):
+            change = _flag_changed(obj, 'is_completed')
+            if change and change[0] != change[1]:
+                completions[(_day(obj.completion_date), obj.course_id)] += 1 if change[1] else -1
+
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            registrations[_day(obj.created_at)] -= 1
+            totals[TOTAL_USERS] -= 1
+            if obj.is_active is not False:
+                totals[ACTIVE_USERS] -= 1
+        elif isinstance(obj, UserCourseProgress):
+            enrollments[(_day(obj.enrollment_date), obj.course_id)] -= 1
+            totals[TOTAL_ENROLLMENTS] -= 1
+            if obj.is_completed:
+                completions[(_day(obj.completion_date), obj.course_id)] -= 1
+
+    if not (registrations or enrollments or completions or totals):
+        return
+
+    conn = session.connection()
+    record_registrations(conn, registrations)
+    record_course_activity(conn, enrollments, completions)
+    record_totals(conn, totals)
+
+def rebuild_rollups():
+    """Recompute every rollup table from users and course progress"""
+    session = db.session
+    session.query(DailyRegistrations).delete()
+    session.query(DailyCourseActivity).delete()
+    session.query(AnalyticsTotal).delete()
+    conn = session.connection()
+
+    registration_day = func.date(User.created_at)
+    record_registrations(conn, {
+        _as_date(day): count
+        for day, count in session.query(registration_day, func.count(User.id)).group_by(registration_day)
+        if day
+    })
+
+    enrollment_day = func.date(UserCourseProgress.enrollment_date)
+    enrollments = {
+        (_as_date(day), course_id): count
+        for day, course_id, count in session.query(
+            enrollment_day, UserCourseProgress.course_id, func.count(UserCourseProgress.id)
+        ).group_by(enrollment_day, UserCourseProgress.course_id)
+        if day
+    }
+    completion_day = func.date(func.coalesce(UserCourseProgress.completion_date, UserCourseProgress.enrollment_date))
+    completions = {
+        (_as_date(day), course_id): count
+        for day, course_id, count in session.query(
+            completion_day, UserCourseProgress.course_id, func.count(UserCourseProgress.id)
+        ).filter(UserCourseProgress.is_completed == True).group_by(completion_day, UserCourseProgress.course_id)
+        if day
+    }
+    record_course_activity(conn, enrollments, completions)
+
+    total_users, active_users = session.query(
+        func.count(User.id),
+        func.sum(case((User.is_active == True, 1), else_=0))
+    ).one()
+    record_totals(conn, {
+        TOTAL_USERS: total_users,
+        ACTIVE_USERS: active_users or 0,
+        TOTAL_ENROLLMENTS: session.query(func.count(UserCourseProgress.id)).scalar()
+    })
+    session.commit()
+
+def rollups_empty():
+    return db.session.query(AnalyticsTotal.name).first() is None
+
+def analytics_summary(days=30):
+    """Dashboard analytics computed from the rollup tables only"""
+    session = db.session
+    since = (datetime.utcnow() - timedelta(days=days)).date()
+
+    totals = dict(session.query(AnalyticsTotal.name, AnalyticsTotal.value).all())
+    recent_registrations = session.query(
+        func.coalesce(func.sum(DailyRegistrations.registrations), 0)
+    ).filter(DailyRegistrations.day >= since).scalar()
+
+    per_course = session.query(
+        DailyCourseActivity.course_id.label('course_id'),
+        func.sum(DailyCourseActivity.enrollments).label('enrollments'),
+        func.sum(DailyCourseActivity.completions).label('completions')
+    ).group_by(DailyCourseActivity.course_id).subquery()
+
+    course_rows = session.query(
+        Course.id,
+        Course.title,
+        Course.category,
+        Course.enrolled_students,
+        Course.average_rating,
+        func.coalesce(per_course.c.enrollments, 0),
+        func.coalesce(per_course.c.completions, 0)
+    ).outerjoin(per_course, per_course.c.course_id == Course.id).filter(
+        Course.is_active == True
+    ).order_by(Course.id).all()
+
+    course_stats = []
+    completion_stats = []
+    for course_id, title, category, enrolled_students, average_rating, enrollments, completions in course_rows:
+        course_stats.append({
+            'id': course_id,
+            'title': title,
+            'category': category,
+            'enrolled_students': enrolled_students,
+            'average_rating': average_rating,
+            'actual_enrollments': enrollments
+        })
+        if enrollments > 0:
+            completion_stats.append({
+                'course_title': title,
+                'total_enrollments': enrollments,
+                'completions': completions,
+                'completion_rate': round(completions / enrollments * 100, 2)
+            })
+
+    activity_rows = session.query(
+        DailyCourseActivity.day,
+        func.sum(DailyCourseActivity.enrollments)
+    ).filter(DailyCourseActivity.day >= since).group_by(DailyCourseActivity.day).order_by(DailyCourseActivity.day).all()
+
+    return {
+        'overview': {
+            'total_users': totals.get(TOTAL_USERS, 0),
+            'active_users': totals.get(ACTIVE_USERS, 0),
+            'total_courses': len(course_rows),
+            'total_enrollments': totals.get(TOTAL_ENROLLMENTS, 0),
+            'recent_registrations': recent_registrations
+        },
+        'course_stats': course_stats,
+        'completion_stats': completion_stats,
+        'activity_chart': [
+            {'date': day.isoformat(), 'enrollments': enrollments}
+            for day, enrollments in activity_rows if enrollments
+        ]
+    }
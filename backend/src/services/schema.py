@@ -0,0 +1,56 @@
+"""Schema upkeep that ``db.create_all()`` does not cover: missing columns and indexes, upserts"""
+from sqlalchemy import inspect, text
+from src.models.user import db
+
+def dialect_insert(conn, model):
+    """INSERT construct for the connection's dialect, supporting ON CONFLICT upserts"""
+    if conn.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+def _index_exists(conn, table, index):
+    if conn.dialect.name == 'sqlite':
+        # The SQLite reflection skips expression indexes, so ask sqlite_master
+        return conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"),
+            {'name': index.name}
+        ).first() is not None
+    return conn.dialect.has_index(conn, table.name, index.name)
+
+def ensure_indexes(engine):
+    """Create declared indexes that do not exist yet; returns their names"""
+    created = []
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                if not _index_exists(conn, table, index):
+                    index.create(bind=conn)
+                    created.append(index.name)
+    return created
+
+def ensure_columns(engine):
+    """Add declared columns missing from existing tables; returns 'table.column' names
+
+    New columns must be nullable or carry a ``server_default``.
+    """
+    added = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column.type.compile(conn.dialect)}'
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                if not column.nullable:
+                    ddl += ' NOT NULL'
+                conn.execute(text(ddl))
+                added.append(f'{table.name}.{column.name}')
+    return added
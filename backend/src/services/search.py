@@ -0,0 +1,225 @@
+"""Full-text course search backed by an SQLite FTS5 index, with an ``ilike`` fallback"""
+import html
+import re
+from sqlalchemy import Integer, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from src.models.user import db
+from src.models.course import Course
+from src.services.catalog_events import has_pending_changes
+
+FTS_TABLE = 'course_fts'
+DIRTY_TABLE = 'course_fts_dirty'
+
+# Private-use characters FTS wraps matches in; swapped for <mark> tags after the snippet is escaped
+_MARK_OPEN = '\ue000'
+_MARK_CLOSE = '\ue001'
+
+# bm25 weights in column order: title, description, instructor, stages, videos
+_BM25_WEIGHTS = '10.0, 2.0, 5.0, 3.0, 1.0'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Builds index rows from the course tables
+_INDEX_ROWS = """
+    INSERT INTO course_fts (rowid, title, description, instructor, stage_titles, video_titles)
+    SELECT c.id, c.title, c.description, coalesce(c.instructor, ''),
+           coalesce((SELECT group_concat(s.title, ' ') FROM course_stage s WHERE s.course_id = c.id), ''),
+           coalesce((SELECT group_concat(v.title, ' ') FROM stage_video v
+                     JOIN course_stage s ON s.id = v.stage_id WHERE s.course_id = c.id), '')
+    FROM course c"""
+
+# Re-populates the index row for one course; {course_id} is NEW.x / OLD.x in triggers
+_REFRESH_ROW = """
+    DELETE FROM course_fts WHERE rowid = {course_id};""" + _INDEX_ROWS + """ WHERE c.id = {course_id};
+"""
+
+# Re-populates the index rows of every course recorded in course_fts_dirty
+_REFRESH_DIRTY = (
+    f"DELETE FROM {FTS_TABLE} WHERE rowid IN (SELECT course_id FROM {DIRTY_TABLE})",
+    _INDEX_ROWS + f" WHERE c.id IN (SELECT course_id FROM {DIRTY_TABLE})",
+    f"DELETE FROM {DIRTY_TABLE}",
+)
+
+def _mark_dirty(course_id_select):
+    return f" INSERT OR IGNORE INTO {DIRTY_TABLE} (course_id) {course_id_select}; "
+
+_STAGE_OF = 'SELECT course_id FROM course_stage WHERE id = {}'
+
+# Course triggers refresh the row directly. Stage and video triggers only mark
+# the course, since rebuilding the row on each of them would make a bulk
+# insert quadratic per course
+_TRIGGERS = {
+    'course_fts_course_ai': ('AFTER INSERT ON course', _REFRESH_ROW.format(course_id='NEW.id')),
+    'course_fts_course_au': ('AFTER UPDATE OF title, description, instructor ON course',
+                             _REFRESH_ROW.format(course_id='NEW.id')),
+    # The course delete trigger only needs to drop the row
+    'course_fts_course_ad': ('AFTER DELETE ON course', f" DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id; "),
+    'course_fts_stage_ai': ('AFTER INSERT ON course_stage', _mark_dirty('VALUES (NEW.course_id)')),
+    'course_fts_stage_au': ('AFTER UPDATE OF title, course_id ON course_stage',
+                            _mark_dirty('VALUES (OLD.course_id), (NEW.course_id)')),
+    'course_fts_stage_ad': ('AFTER DELETE ON course_stage', _mark_dirty('VALUES (OLD.course_id)')),
+    # A SELECT rather than VALUES: a video whose stage is already gone marks nothing
+    'course_fts_video_ai': ('AFTER INSERT ON stage_video', _mark_dirty(_STAGE_OF.format('NEW.stage_id'))),
+    'course_fts_video_au': ('AFTER UPDATE OF title, stage_id ON stage_video',
+                            _mark_dirty(_STAGE_OF.format('NEW.stage_id') + ' UNION '
+                                        + _STAGE_OF.format('OLD.stage_id'))),
+    'course_fts_video_ad': ('AFTER DELETE ON stage_video', _mark_dirty(_STAGE_OF.format('OLD.stage_id'))),
+}
+
+# Set once per process; None means "not checked yet"
+_fts_enabled = None
+
+def install_search_index(engine):
+    """Create the FTS5 table and sync triggers if missing; returns True if search is indexed"""
+    global _fts_enabled
+    if engine.dialect.name != 'sqlite':
+        _fts_enabled = False
+        return False
+
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE}
+        ).first()
+        if not exists:
+            try:
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                    "title, description, instructor, stage_titles, video_titles, "
+                    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                ))
+            except OperationalError:
+                # SQLite compiled without FTS5
+                _fts_enabled = False
+                return False
+
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DIRTY_TABLE} (course_id INTEGER PRIMARY KEY)"))
+        # Recreated every time so databases installed with older trigger bodies pick up the current ones
+        for name, (when, body) in _TRIGGERS.items():
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            conn.execute(text(f"CREATE TRIGGER {name} {when} BEGIN{body}END"))
+
+        if not exists:
+            _rebuild(conn)
+        else:
+            refresh_dirty_courses(conn)
+
+    _fts_enabled = True
+    return True
+
+def rebuild_search_index():
+    """Repopulate the index from the course tables"""
+    with db.engine.begin() as conn:
+        _rebuild(conn)
+
+def _rebuild(conn):
+    conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    conn.execute(text(_INDEX_ROWS))
+    conn.execute(text(f"DELETE FROM {DIRTY_TABLE}"))
+
+def refresh_dirty_courses(conn):
+    """Re-index the courses whose stages or videos changed since the last refresh, on ``conn``
+
+    Stage and video triggers only record the course in ``course_fts_dirty``;
+    session commits refresh automatically, writes on a raw connection call
+    this before committing.
+    """
+    for statement in _REFRESH_DIRTY:
+        conn.execute(text(statement))
+
+@event.listens_for(Session, 'before_commit')
+def _refresh_before_commit(session):
+    # Only transactions that touched the catalog can have marked courses
+    if not has_pending_changes(session) or not fts_available():
+        return
+    # before_commit runs ahead of the final flush, so flush first to fire the triggers
+    session.flush()
+    refresh_dirty_courses(session.connection())
+
+def fts_available():
+    """Whether the FTS index and its dirty-course table exist for the current database"""
+    global _fts_enabled
+    if _fts_enabled is None:
+        engine = db.engine
+        if engine.dialect.name != 'sqlite':
+            _fts_enabled = False
+        else:
+            with engine.connect() as conn:
+                _fts_enabled = conn.execute(
+                    text("SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name IN (:fts, :dirty)"),
+                    {'fts': FTS_TABLE, 'dirty': DIRTY_TABLE}
+                ).scalar() == 2
+    return _fts_enabled
+
+def build_match_query(term, prefix=True):
+    """Turn user input into a safe FTS5 MATCH expression
+
+    Every token is quoted so FTS syntax characters in the input are treated as
+    text. With ``prefix`` the last token matches as a prefix for typeahead.
+    Returns None when the input has no searchable tokens.
+    """
+    tokens = _TOKEN_RE.findall(term or '')
+    if not tokens:
+        return None
+    parts = [f'"{token}"' for token in tokens]
+    if prefix:
+        parts[-1] += '*'
+    return ' '.join(parts)
+
+def search_filter(term):
+    """SQL criterion restricting a ``Course`` query to courses matching ``term``"""
+    if fts_available():
+        match = build_match_query(term)
+        if match is None:
+            return db.false()
+        matching_ids = text(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+        ).bindparams(match=match).columns(rowid=Integer)
+        return Course.id.in_(matching_ids)
+
+    search_term = f"%{term}%"
+    return db.or_(
+        Course.title.ilike(search_term),
+        Course.description.ilike(search_term),
+        Course.instructor.ilike(search_term)
+    )
+
+def search_courses(term, limit=10):
+    """BM25-ranked active courses matching ``term``, with a highlighted snippet
+
+    Returns a list of dicts ordered best match first.
+    """
+    if not fts_available():
+        courses = Course.query.filter(Course.is_active == True, search_filter(term)).limit(limit).all()
+        return [{
+            'id': course.id,
+            'title': course.title,
+            'category': course.category,
+            'difficulty': course.difficulty,
+            'thumbnail_url': course.thumbnail_url,
+            'snippet': None,
+            'score': None
+        } for course in courses]
+
+    match = build_match_query(term)
+    if match is None:
+        return []
+
+    rows = db.session.execute(text(
+        f"SELECT c.id, c.title, c.category, c.difficulty, c.thumbnail_url, "
+        f"snippet({FTS_TABLE}, -1, '{_MARK_OPEN}', '{_MARK_CLOSE}', '...', 12) AS snippet, "
+        f"bm25({FTS_TABLE}, {_BM25_WEIGHTS}) AS score "
+        f"FROM {FTS_TABLE} JOIN course c ON c.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH :match AND c.is_active = 1 "
+        f"ORDER BY score LIMIT :limit"
+    ), {'match': match, 'limit': limit})
+
+    # bm25 is lower-is-better; flip the sign so clients can sort descending
+    return [dict(row._asdict(), snippet=highlight_snippet(row.snippet), score=-row.score) for row in rows]
+
+def highlight_snippet(snippet):
+    """HTML-escape an FTS snippet and turn its match markers into <mark> tags"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_MARK_OPEN, '<mark>').replace(_MARK_CLOSE, '</mark>')
@@ -0,0 +1,117 @@
+"""Schema-driven serialization of query rows, and the orjson-backed JSON provider"""
+import threading
+from flask.json.provider import DefaultJSONProvider
+from src.models.course import Course, CourseStage, StageVideo
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library json is used instead
+    orjson = None
+
+class Schema:
+    """Response fields of one model and compiled extractors for them"""
+
+    def __init__(self, model, fields, datetimes=(), derived=None):
+        self.model = model
+        self.fields = tuple(fields) + tuple(datetimes)
+        self.datetimes = frozenset(datetimes)
+        # name -> (source field, function of the source value)
+        self.derived = dict(derived or {})
+        self.columns = tuple(getattr(model, name) for name in self.fields)
+        self._serializers = {}
+        self._lock = threading.Lock()
+
+    def _compile(self, keys):
+        """Generate ``serialize(row)`` returning a dict literal over ``keys``"""
+        namespace = {}
+        items = []
+        sources = {}
+        for index, key in enumerate(keys):
+            if key.startswith('_'):
+                continue
+            value = f'row[{index}]'
+            sources[key] = value
+            if key in self.datetimes:
+                value = f'({value}.isoformat() if {value} is not None else None)'
+            items.append(f'{key!r}: {value}')
+        for number, (name, (source, function)) in enumerate(self.derived.items()):
+            if source in sources:
+                namespace[f'_derived{number}'] = function
+                items.append(f'{name!r}: _derived{number}({sources[source]})')
+
+        code = f"def serialize(row):\n    return {{{', '.join(items)}}}\n"
+        exec(compile(code, f'<serializer {self.model.__name__}>', 'exec'), namespace)
+        return namespace['serialize']
+
+    def serializer(self, keys):
+        """Compiled ``row -> dict`` for rows with these keys (``row._fields``)"""
+        keys = tuple(keys)
+        serialize = self._serializers.get(keys)
+        if serialize is None:
+            serialize = self._compile(keys)
+            with self._lock:
+                self._serializers[keys] = serialize
+        return serialize
+
+    def dump_row(self, row):
+        return self.serializer(row._fields)(row)
+
+    def dump_rows(self, rows):
+        """Serialize rows that share one shape, e.g. the result of one query"""
+        if not rows:
+            return []
+        serialize = self.serializer(rows[0]._fields)
+        return [serialize(row) for row in rows]
+
+def youtube_url(youtube_id):
+    return f'https://www.youtube.com/watch?v={youtube_id}'
+
+def embed_url(youtube_id):
+    return f'https://www.youtube.com/embed/{youtube_id}'
+
+COURSE_SCHEMA = Schema(Course, (
+    'id', 'title', 'description', 'thumbnail_url', 'category', 'difficulty', 'duration_weeks',
+    'instructor', 'average_rating', 'enrolled_students', 'is_featured', 'is_active'
+), datetimes=('created_at', 'updated_at'))
+
+STAGE_SCHEMA = Schema(CourseStage, (
+    'id', 'course_id', 'title', 'description', 'duration_hours', 'order_index', 'is_active'
+), datetimes=('created_at',))
+
+VIDEO_SCHEMA = Schema(StageVideo, (
+    'id', 'stage_id', 'title', 'youtube_id', 'order_index', 'duration_minutes', 'description', 'is_active'
+), datetimes=('created_at',), derived={
+    'youtube_url': ('youtube_id', youtube_url),
+    'embed_url': ('youtube_id', embed_url)
+})
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider encoding with orjson; other values go through Flask's ``default``"""
+
+    def _options(self, kwargs):
+        # Datetimes keep Flask's HTTP date format instead of orjson's ISO output
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._options(kwargs)).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options({}) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def configure_json(app):
+    """Install the JSON backend selected by ``JSON_BACKEND`` ('auto', 'orjson' or 'json')"""
+    backend = app.config.get('JSON_BACKEND', 'auto')
+    if backend not in ('auto', 'orjson', 'json'):
+        raise ValueError(f'Unknown JSON_BACKEND: {backend}')
+    if backend == 'orjson' and orjson is None:
+        raise RuntimeError('JSON_BACKEND=orjson requires the orjson package')
+    if backend != 'json' and orjson is not None:
+        app.json = OrjsonProvider(app)
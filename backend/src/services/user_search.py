@@ -0,0 +1,118 @@
+"""Prefix and substring search over the user directory for the admin panel"""
+from sqlalchemy import Integer, text
+from sqlalchemy.exc import OperationalError
+from src.models.user import User, db
+
+FTS_TABLE = 'user_fts'
+
+SEARCH_MODES = ('prefix', 'substring')
+
+_SEARCH_COLUMNS = (User.email, User.username, User.first_name, User.last_name)
+
+# Trigram tokens are three characters long; shorter terms cannot match
+_MIN_TRIGRAM_LENGTH = 3
+
+# External content table: the index stores only trigrams, rows live in "user"
+_TRIGGERS = (
+    """CREATE TRIGGER IF NOT EXISTS user_fts_ai AFTER INSERT ON "user" BEGIN
+        INSERT INTO user_fts (rowid, email, username, first_name, last_name)
+        VALUES (NEW.id, NEW.email, NEW.username, NEW.first_name, NEW.last_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_fts_ad AFTER DELETE ON "user" BEGIN
+        INSERT INTO user_fts (user_fts, rowid, email, username, first_name, last_name)
+        VALUES ('delete', OLD.id, OLD.email, OLD.username, OLD.first_name, OLD.last_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_fts_au AFTER UPDATE OF email, username, first_name, last_name ON "user" BEGIN
+        INSERT INTO user_fts (user_fts, rowid, email, username, first_name, last_name)
+        VALUES ('delete', OLD.id, OLD.email, OLD.username, OLD.first_name, OLD.last_name);
+        INSERT INTO user_fts (rowid, email, username, first_name, last_name)
+        VALUES (NEW.id, NEW.email, NEW.username, NEW.first_name, NEW.last_name);
+    END""",
+)
+
+# Set once per process; None means "not checked yet"
+_trigram_enabled = None
+
+def install_user_search_index(engine):
+    """Create the trigram index and its triggers if missing; returns True if available"""
+    global _trigram_enabled
+    if engine.dialect.name != 'sqlite':
+        _trigram_enabled = False
+        return False
+
+    with engine.begin() as conn:
+        exists = _index_exists(conn)
+        if not exists:
+            try:
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                    "email, username, first_name, last_name, "
+                    "content = 'user', content_rowid = 'id', tokenize = 'trigram')"
+                ))
+            except OperationalError:
+                # No FTS5, or SQLite older than 3.34 without the trigram tokenizer
+                _trigram_enabled = False
+                return False
+
+        for trigger in _TRIGGERS:
+            conn.execute(text(trigger))
+
+        if not exists:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')"))
+
+    _trigram_enabled = True
+    return True
+
+def _index_exists(conn):
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': FTS_TABLE}
+    ).first() is not None
+
+def trigram_available():
+    """Whether the trigram index exists for the current database"""
+    global _trigram_enabled
+    if _trigram_enabled is None:
+        if db.engine.dialect.name != 'sqlite':
+            _trigram_enabled = False
+        else:
+            with db.engine.connect() as conn:
+                _trigram_enabled = _index_exists(conn)
+    return _trigram_enabled
+
+def _prefix_upper_bound(prefix):
+    """Smallest string greater than every string starting with ``prefix``"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def prefix_filter(term):
+    """Range criterion over the lower() expression indexes"""
+    prefix = term.strip().lower()
+    upper = _prefix_upper_bound(prefix)
+    return db.or_(*[
+        db.and_(db.func.lower(column) >= prefix, db.func.lower(column) < upper)
+        for column in _SEARCH_COLUMNS
+    ])
+
+def substring_filter(term):
+    """Trigram criterion matching ``term`` anywhere in the searchable columns"""
+    term = term.strip()
+    if len(term) < _MIN_TRIGRAM_LENGTH or not trigram_available():
+        search_term = f"%{term}%"
+        return db.or_(*[column.ilike(search_term) for column in _SEARCH_COLUMNS])
+
+    # Quote the whole term so it is matched as one literal substring
+    match = '"' + term.replace('"', '""') + '"'
+    matching_ids = text(
+        f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+    ).bindparams(match=match).columns(rowid=Integer)
+    return User.id.in_(matching_ids)
+
+def user_search_filter(term, mode='substring'):
+    """SQL criterion for an admin user search; raises ValueError for an unknown mode"""
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"search_mode must be one of: {', '.join(SEARCH_MODES)}")
+    if not term.strip():
+        return db.true()
+    if mode == 'substring':
+        return substring_filter(term)
+    return prefix_filter(term)
@@ -0,0 +1,139 @@
+"""Serving the built frontend from a manifest of the static folder made at startup"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from collections import namedtuple
+from flask import Response, request
+from werkzeug.wsgi import wrap_file
+
+try:
+    import brotli
+except ImportError:  # optional: only needed to write .br variants
+    brotli = None
+
+IMMUTABLE_PREFIX = 'assets/'
+HASHED_NAME = re.compile(r'-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'application/xml',
+                      'image/svg+xml', 'application/wasm', 'application/manifest+json')
+MIN_COMPRESS_SIZE = 1024
+
+StaticFile = namedtuple('StaticFile', ('path', 'size', 'mtime', 'etag', 'mimetype', 'immutable', 'variants'))
+Variant = namedtuple('Variant', ('path', 'size', 'etag'))
+
+def _file_hash(path):
+    digest = hashlib.blake2b(digest_size=12)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _is_compressible(mimetype):
+    return mimetype is not None and mimetype.startswith(COMPRESSIBLE_TYPES)
+
+def _walk(root):
+    """Relative POSIX paths of every file under ``root``"""
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            full_path = os.path.join(dirpath, name)
+            yield os.path.relpath(full_path, root).replace(os.sep, '/'), full_path
+
+class StaticManifest:
+    """In-memory index of the static folder; ``send`` serves an entry without touching the filesystem metadata"""
+
+    def __init__(self, root):
+        self.root = root
+        self.files = {}
+        self.build()
+
+    def build(self):
+        paths = dict(_walk(self.root)) if self.root and os.path.isdir(self.root) else {}
+        files = {}
+        for rel_path, full_path in paths.items():
+            # A .br/.gz next to its original is a variant of it, not a file of its own
+            if any(rel_path.endswith(suffix) and rel_path[:-len(suffix)] in paths for _, suffix in ENCODINGS):
+                continue
+            stat = os.stat(full_path)
+            file_hash = _file_hash(full_path)
+            variants = {}
+            for encoding, suffix in ENCODINGS:
+                variant_path = paths.get(rel_path + suffix)
+                if variant_path is not None:
+                    variants[encoding] = Variant(variant_path, os.path.getsize(variant_path), f'{file_hash}-{encoding}')
+            files[rel_path] = StaticFile(
+                path=full_path,
+                size=stat.st_size,
+                mtime=int(stat.st_mtime),
+                etag=file_hash,
+                mimetype=mimetypes.guess_type(rel_path)[0] or 'application/octet-stream',
+                immutable=rel_path.startswith(IMMUTABLE_PREFIX) and bool(HASHED_NAME.search(rel_path)),
+                variants=variants
+            )
+        self.files = files
+        return self
+
+    def get(self, path):
+        return self.files.get(path)
+
+    def _negotiate(self, entry):
+        """(encoding, path, size, etag) of the best representation the client accepts"""
+        for encoding, _ in ENCODINGS:
+            variant = entry.variants.get(encoding)
+            if variant is not None and request.accept_encodings[encoding] > 0:
+                return encoding, variant.path, variant.size, variant.etag
+        return None, entry.path, entry.size, entry.etag
+
+    def send(self, entry):
+        """Response for ``entry``: 304 on a matching If-None-Match, else the (precompressed) file"""
+        encoding, path, size, etag = self._negotiate(entry)
+
+        response = Response(mimetype=entry.mimetype)
+        response.set_etag(etag)
+        response.last_modified = entry.mtime
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if entry.immutable else REVALIDATE_CACHE_CONTROL
+        if entry.variants:
+            response.vary.add('Accept-Encoding')
+        if encoding:
+            response.content_encoding = encoding
+
+        if request.if_none_match.contains(etag):
+            response.status_code = 304
+            return response
+        response.content_length = size
+        if request.method != 'HEAD':
+            response.response = wrap_file(request.environ, open(path, 'rb'))
+            response.direct_passthrough = True
+        return response
+
+def precompress(root, min_size=MIN_COMPRESS_SIZE):
+    """Write .gz (and .br when brotli is installed) next to compressible files; returns files written"""
+    written = 0
+    paths = dict(_walk(root)) if root and os.path.isdir(root) else {}
+    for rel_path, full_path in paths.items():
+        if rel_path.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+            continue
+        if not _is_compressible(mimetypes.guess_type(rel_path)[0]) or os.path.getsize(full_path) < min_size:
+            continue
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        compressors = [('.gz', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            compressors.append(('.br', lambda raw: brotli.compress(raw, quality=11)))
+        for suffix, compress in compressors:
+            target = full_path + suffix
+            if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(full_path):
+                continue
+            compressed = compress(data)
+            # Only worth serving when it is actually smaller
+            if len(compressed) < len(data):
+                with open(target, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+    return written